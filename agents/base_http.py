@@ -7,12 +7,13 @@ Agents receive LangChain tools directly from the MCP client.
 import os
 import json
 import logging
-import re
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 import asyncio
 import inspect
 
+import httpx
+import orjson
 from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate
@@ -21,6 +22,37 @@ from mcp_client import get_mcp_client
 
 logger = logging.getLogger("kyc.agents")
 
+# Decodes the first JSON object embedded in an LLM response (see parse_response)
+JSON_DECODER = json.JSONDecoder()
+
+# Shared HTTP/2 client for Azure OpenAI, reused by every agent instance
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the HTTP/2 client shared by all agent LLMs.
+    
+    Agents are instantiated per graph node, so without a shared client every
+    step would open (and TLS-negotiate) its own connection to Azure OpenAI.
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        )
+    return _http_client
+
+
+async def close_shared_http_client() -> None:
+    """Close the shared Azure OpenAI HTTP client (call on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class BaseKYCAgentHTTP(ABC):
     """
@@ -54,6 +86,7 @@ class BaseKYCAgentHTTP(ABC):
             api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-10-21"),
             temperature=0.3,
             max_tokens=2000,
+            http_async_client=get_shared_http_client(),
         )
     
     @property
@@ -129,13 +162,23 @@ class BaseKYCAgentHTTP(ABC):
     
     def parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the LLM response to extract structured JSON."""
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
+        # Fast path: the response is usually the JSON object on its own
+        stripped = response_text.strip()
+        if stripped.startswith("{") and stripped.endswith("}"):
             try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
+                return orjson.loads(stripped)
+            except orjson.JSONDecodeError:
                 pass
         
+        # Decode the first well-formed object starting at a "{" - a linear scan, unlike
+        # a greedy {...} regex which backtracks badly on long outputs with many braces
+        start = response_text.find("{")
+        while start != -1:
+            try:
+                return JSON_DECODER.raw_decode(response_text, start)[0]
+            except json.JSONDecodeError:
+                start = response_text.find("{", start + 1)
+        
         logger.warning(f"Could not parse JSON from agent response: {response_text[:200]}")
         return {
             "stage": self.step_name,
@@ -207,6 +250,9 @@ class BaseKYCAgentHTTP(ABC):
             else:
                 llm_with_tools = self.llm
             
+            # Only this agent's tools may run; the LLM can name tools it was never given
+            tools_by_name = {tool.name: tool for tool in tools}
+            
             # Agentic loop: allow LLM to call tools multiple times
             max_iterations = 5
             iteration = 0
@@ -221,39 +267,51 @@ class BaseKYCAgentHTTP(ABC):
                 if hasattr(response, 'tool_calls') and response.tool_calls:
                     logger.info(f"Agent {self.step_name} requesting tool calls: {[tc['name'] for tc in response.tool_calls]}")
                     
-                    # Execute each tool call
-                    for tool_call in response.tool_calls:
+                    # Record the assistant turn once, then answer every tool call in it
+                    messages.append(AIMessage(content="", tool_calls=response.tool_calls))
+                    
+                    # Execute this turn's known tool calls concurrently
+                    resolved = [tools_by_name.get(tool_call['name']) for tool_call in response.tool_calls]
+                    results = iter(await asyncio.gather(
+                        *(tool.ainvoke(tool_call['args'])
+                          for tool, tool_call in zip(resolved, response.tool_calls) if tool is not None),
+                        return_exceptions=True
+                    ))
+                    
+                    for tool_call, tool in zip(response.tool_calls, resolved):
                         tool_name = tool_call['name']
                         tool_args = tool_call['args']
                         tool_call_id = tool_call.get('id', str(iteration))
                         
-                        logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
-                        
-                        # Find and execute the tool
-                        tool = next((t for t in tools if t.name == tool_name), None)
-                        if tool:
-                            try:
-                                tool_result = await tool.ainvoke(tool_args)
-                                tool_calls_made.append({
-                                    "tool_name": tool_name,
-                                    "arguments": tool_args,
-                                    "result": tool_result
-                                })
-                                
-                                # Add tool result to conversation
-                                messages.append(AIMessage(content="", tool_calls=response.tool_calls))
-                                messages.append(ToolMessage(
-                                    content=json.dumps(tool_result, default=str),
-                                    tool_call_id=tool_call_id
-                                ))
-                            except Exception as e:
-                                logger.error(f"Tool execution error: {e}")
-                                messages.append(ToolMessage(
-                                    content=f"Error: {str(e)}",
-                                    tool_call_id=tool_call_id
-                                ))
-                        else:
+                        # Every tool call needs an answer, including ones for unknown tools
+                        if tool is None:
                             logger.error(f"Tool not found: {tool_name}")
+                            messages.append(ToolMessage(
+                                content=f"Error: Tool not found: {tool_name}",
+                                tool_call_id=tool_call_id
+                            ))
+                            continue
+                        
+                        tool_result = next(results)
+                        if isinstance(tool_result, Exception):
+                            logger.error(f"Tool execution error for {tool_name}: {tool_result}")
+                            messages.append(ToolMessage(
+                                content=f"Error: {str(tool_result)}",
+                                tool_call_id=tool_call_id
+                            ))
+                            continue
+                        
+                        tool_calls_made.append({
+                            "tool_name": tool_name,
+                            "arguments": tool_args,
+                            "result": tool_result
+                        })
+                        
+                        # Add tool result to conversation
+                        messages.append(ToolMessage(
+                            content=json.dumps(tool_result, default=str),
+                            tool_call_id=tool_call_id
+                        ))
                     
                     # Continue loop to let LLM see tool results
                     continue
@@ -37,6 +37,7 @@ CREATE TABLE policy_documents (
     content TEXT NOT NULL,
     chunk_index INT NOT NULL DEFAULT 0,
     embedding vector(1536),  -- Azure OpenAI text-embedding-ada-002
+    embedding_half halfvec(1536) GENERATED ALWAYS AS (embedding::halfvec(1536)) STORED,  -- FP16 copy for search
     uploaded_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
     status VARCHAR(50) DEFAULT 'indexed',
     error_message TEXT,
@@ -45,9 +46,24 @@ CREATE TABLE policy_documents (
 );
 
 -- Index for vector similarity search (IVFFlat)
+-- Inner product ops: embeddings are unit length, so <#> ranks like cosine without the norm computation
 -- Note: After inserting data, run: ANALYZE policy_documents;
 CREATE INDEX idx_policy_embedding ON policy_documents 
-    USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    USING ivfflat (embedding vector_ip_ops) WITH (lists = 100);
+
+-- HNSW index over the FP16 copy, used when RAG_USE_HALFVEC=true (pgvector >= 0.7)
+CREATE INDEX idx_policy_embedding_half ON policy_documents 
+    USING hnsw (embedding_half halfvec_ip_ops);
+
+-- Partial HNSW indexes matching the category whitelists used by the RAG tools
+-- (check_compliance and get_policy_requirements), so those searches are filtered
+-- inside the index instead of post-filtering the full ANN scan
+CREATE INDEX idx_policy_embedding_compliance ON policy_documents 
+    USING hnsw (embedding vector_ip_ops)
+    WHERE category IN ('compliance', 'aml', 'kyc', 'eligibility');
+CREATE INDEX idx_policy_embedding_requirements ON policy_documents 
+    USING hnsw (embedding vector_ip_ops)
+    WHERE category IN ('compliance', 'eligibility', 'requirements');
 
 CREATE INDEX idx_policy_category ON policy_documents(category);
 CREATE INDEX idx_policy_filename ON policy_documents(filename);
@@ -101,4 +117,29 @@ FROM policy_documents
 GROUP BY category
 ORDER BY category;
 
+-- =====================
+--  POLICY CATEGORY COUNTS
+-- =====================
+
+-- Chunk counts per category, read by list_policy_categories instead of a GROUP BY
+-- over every chunk. A statement-level trigger refreshes it after each write
+-- statement (a bulk COPY refreshes once); CONCURRENTLY keeps it readable meanwhile.
+CREATE MATERIALIZED VIEW policy_category_counts AS
+SELECT category, COUNT(*) AS document_count
+FROM policy_documents
+GROUP BY category;
+
+CREATE UNIQUE INDEX idx_policy_category_counts ON policy_category_counts(category);
+
+CREATE OR REPLACE FUNCTION refresh_policy_category_counts() RETURNS trigger AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY policy_category_counts;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_refresh_policy_category_counts
+    AFTER INSERT OR DELETE OR UPDATE OF category OR TRUNCATE ON policy_documents
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_policy_category_counts();
+
 -- End of KYC extensions schema
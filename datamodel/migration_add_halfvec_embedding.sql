@@ -0,0 +1,15 @@
+-- Migration script to add an FP16 (halfvec) copy of policy embeddings
+-- Requires pgvector >= 0.7. Run this against your Postgres database.
+--
+-- The generated column is filled from embedding on insert, so ingestion code is
+-- unchanged. The original vector(1536) column is kept for A/B quality checks;
+-- set RAG_USE_HALFVEC=true to search the halfvec column instead.
+
+ALTER TABLE policy_documents 
+ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536)
+    GENERATED ALWAYS AS (embedding::halfvec(1536)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_policy_embedding_half ON policy_documents 
+    USING hnsw (embedding_half halfvec_ip_ops);
+
+ANALYZE policy_documents;
@@ -0,0 +1,24 @@
+-- Migration script to add the policy_category_counts materialized view
+-- Run this against your Postgres database.
+
+-- Chunk counts per category, read by list_policy_categories instead of a GROUP BY
+-- over every chunk. A statement-level trigger refreshes it after each write
+-- statement (a bulk COPY refreshes once); CONCURRENTLY keeps it readable meanwhile.
+CREATE MATERIALIZED VIEW IF NOT EXISTS policy_category_counts AS
+SELECT category, COUNT(*) AS document_count
+FROM policy_documents
+GROUP BY category;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_policy_category_counts ON policy_category_counts(category);
+
+CREATE OR REPLACE FUNCTION refresh_policy_category_counts() RETURNS trigger AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY policy_category_counts;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_refresh_policy_category_counts ON policy_documents;
+CREATE TRIGGER trg_refresh_policy_category_counts
+    AFTER INSERT OR DELETE OR UPDATE OF category OR TRUNCATE ON policy_documents
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_policy_category_counts();
@@ -12,3 +12,22 @@ ADD COLUMN IF NOT EXISTS total_chunks INT;
 UPDATE policy_documents 
 SET status = 'indexed', original_filename = filename 
 WHERE status IS NULL;
+
+-- Document lookups, chunk listings and deletes all filter by filename
+CREATE INDEX IF NOT EXISTS idx_policy_filename ON policy_documents(filename);
+CREATE INDEX IF NOT EXISTS idx_policy_category ON policy_documents(category);
+
+-- Approximate nearest-neighbour index so similarity searches avoid a full table scan
+-- (same definition as kyc_extensions_schema.sql). Run ANALYZE after loading data.
+CREATE INDEX IF NOT EXISTS idx_policy_embedding ON policy_documents 
+    USING ivfflat (embedding vector_ip_ops) WITH (lists = 100);
+
+-- Partial HNSW indexes matching the category whitelists used by the RAG tools
+-- (check_compliance and get_policy_requirements), so those searches are filtered
+-- inside the index instead of post-filtering the full ANN scan
+CREATE INDEX IF NOT EXISTS idx_policy_embedding_compliance ON policy_documents 
+    USING hnsw (embedding vector_ip_ops)
+    WHERE category IN ('compliance', 'aml', 'kyc', 'eligibility');
+CREATE INDEX IF NOT EXISTS idx_policy_embedding_requirements ON policy_documents 
+    USING hnsw (embedding vector_ip_ops)
+    WHERE category IN ('compliance', 'eligibility', 'requirements');
@@ -0,0 +1,27 @@
+-- Migration script to rebuild policy embedding indexes with inner product ops
+-- Run this against your Postgres database.
+--
+-- Azure OpenAI embeddings are unit length, so negative inner product (<#>)
+-- gives the same ranking as cosine distance (<=>) without the per-row norm
+-- computation. The RAG servers now query with <#>, which can only use
+-- vector_ip_ops / halfvec_ip_ops indexes.
+
+DROP INDEX IF EXISTS idx_policy_embedding;
+CREATE INDEX idx_policy_embedding ON policy_documents 
+    USING ivfflat (embedding vector_ip_ops) WITH (lists = 100);
+
+DROP INDEX IF EXISTS idx_policy_embedding_half;
+CREATE INDEX idx_policy_embedding_half ON policy_documents 
+    USING hnsw (embedding_half halfvec_ip_ops);
+
+DROP INDEX IF EXISTS idx_policy_embedding_compliance;
+CREATE INDEX idx_policy_embedding_compliance ON policy_documents 
+    USING hnsw (embedding vector_ip_ops)
+    WHERE category IN ('compliance', 'aml', 'kyc', 'eligibility');
+
+DROP INDEX IF EXISTS idx_policy_embedding_requirements;
+CREATE INDEX idx_policy_embedding_requirements ON policy_documents 
+    USING hnsw (embedding vector_ip_ops)
+    WHERE category IN ('compliance', 'eligibility', 'requirements');
+
+ANALYZE policy_documents;
@@ -8,24 +8,28 @@ Before running this application:
 1. Start all MCP servers: ./start_all_mcp_servers.sh
 2. Verify servers are running on ports 8001-8004
 3. Then start this FastAPI app: uvicorn main_http:app --reload --port 8000
+   (for several workers set REDIS_URL and use gunicorn, see README "Multiple Workers")
 """
 import os
 import json
 import uuid
-import asyncio
-from pathlib import Path
+import time
+import orjson
 from typing import Optional, Dict, Any, List
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Header, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, Header, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, EmailStr
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, AIMessage
 
 # Import HTTP MCP Client
-from mcp_client import initialize_mcp_client, get_mcp_client
+from mcp_client import initialize_mcp_client
 from graph import app_graph
+from agents.base_http import close_shared_http_client
+from session_store import create_session_store
 
 # Import error handling and tracing
 from error_handling import (
@@ -47,6 +51,14 @@ load_dotenv()
 SERVICE_NAME = "kyc-orchestrator"
 VERSION = "4.0.0"
 
+# MCP server endpoints (fixed for the life of the process)
+MCP_SERVER_URLS = {
+    "postgres": os.getenv("MCP_POSTGRES_URL", "http://127.0.0.1:8001/mcp"),
+    "blob": os.getenv("MCP_BLOB_URL", "http://127.0.0.1:8002/mcp"),
+    "email": os.getenv("MCP_EMAIL_URL", "http://127.0.0.1:8003/mcp"),
+    "rag": os.getenv("MCP_RAG_URL", "http://127.0.0.1:8004/mcp"),
+}
+
 # Set up logger
 import logging
 logger = logging.getLogger(SERVICE_NAME)
@@ -58,24 +70,38 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing HTTP MCP client...")
     
     try:
-        # Initialize HTTP MCP client (connects to servers on ports 8001-8004)
-        mcp_client = initialize_mcp_client(
-            postgres_url=os.getenv("MCP_POSTGRES_URL", "http://127.0.0.1:8001/mcp"),
-            blob_url=os.getenv("MCP_BLOB_URL", "http://127.0.0.1:8002/mcp"),
-            email_url=os.getenv("MCP_EMAIL_URL", "http://127.0.0.1:8003/mcp"),
-            rag_url=os.getenv("MCP_RAG_URL", "http://127.0.0.1:8004/mcp"),
-        )
+        # Sessions: file-backed for a single worker, Redis (REDIS_URL) when running several
+        session_store = create_session_store()
+        await session_store.start()
+        app.state.session_store = session_store
         
-        # Initialize connection
-        await mcp_client.initialize()
+        try:
+            # Initialize HTTP MCP client (connects to servers on ports 8001-8004)
+            mcp_client = initialize_mcp_client(
+                postgres_url=MCP_SERVER_URLS["postgres"],
+                blob_url=MCP_SERVER_URLS["blob"],
+                email_url=MCP_SERVER_URLS["email"],
+                rag_url=MCP_SERVER_URLS["rag"],
+            )
+            
+            # Initialize connection
+            await mcp_client.initialize()
+        except Exception:
+            # Stop the session flusher task / close the Redis connection started above
+            await session_store.close()
+            raise
         app.state.mcp_client = mcp_client
         logger.info("HTTP MCP client initialized successfully")
         
         yield
         
+        # Write out pending session changes
+        await session_store.close()
+        
         # Cleanup
         logger.info("Shutting down HTTP MCP client...")
         await mcp_client.close()
+        await close_shared_http_client()
         logger.info("HTTP MCP client shut down")
         
     except Exception as e:
@@ -87,7 +113,8 @@ app = FastAPI(
     title=f"Azure AI Agents {SERVICE_NAME}", 
     version=VERSION,
     description="KYC system with HTTP MCP servers for true service decoupling",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Serialize every JSON response with orjson
 )
 
 # Configure error handling and tracing
@@ -112,38 +139,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Session persistence
-SESSIONS_FILE = Path("sessions.json")
-
-
-@trace_function()
-def load_sessions() -> Dict[str, Any]:
-    """Load sessions from file."""
-    try:
-        if SESSIONS_FILE.exists():
-            with open(SESSIONS_FILE, "r") as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        app.state.logger.error("Failed to load sessions", exc_info=True)
-        return {}
-
-
-@trace_function()
-def save_sessions(sessions: Dict[str, Any]) -> None:
-    """Save sessions to file."""
-    try:
-        with open(SESSIONS_FILE, "w") as f:
-            json.dump(sessions, f, indent=2)
-    except Exception as e:
-        app.state.logger.error("Failed to save sessions", exc_info=True)
-        raise ServiceUnavailableError("Session Storage", cause=e)
-
-
-# Initialize sessions
-sessions = load_sessions()
-
-
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -162,34 +157,40 @@ class ChatResponse(BaseModel):
     customer: Dict[str, Any]
 
 
+# Bodies of the constant endpoints, encoded once instead of on every request
+ROOT_BODY = orjson.dumps({
+    "service": f"{SERVICE_NAME} with HTTP MCP",
+    "version": VERSION,
+    "status": "running",
+    "mcp_architecture": "HTTP (decoupled servers)",
+    "mcp_servers": MCP_SERVER_URLS
+})
+MCP_SERVERS_BODY = orjson.dumps({"servers": MCP_SERVER_URLS})
+
+
 @app.get("/")
-@handle_errors()
 @trace_function()
 async def root():
     """Health check endpoint."""
-    return {
-        "service": f"{SERVICE_NAME} with HTTP MCP",
-        "version": VERSION,
-        "status": "running",
-        "mcp_architecture": "HTTP (decoupled servers)",
-        "mcp_servers": {
-            "postgres": os.getenv("MCP_POSTGRES_URL", "http://127.0.0.1:8001/mcp"),
-            "blob": os.getenv("MCP_BLOB_URL", "http://127.0.0.1:8002/mcp"),
-            "email": os.getenv("MCP_EMAIL_URL", "http://127.0.0.1:8003/mcp"),
-            "rag": os.getenv("MCP_RAG_URL", "http://127.0.0.1:8004/mcp"),
-        }
-    }
+    return Response(content=ROOT_BODY, media_type="application/json")
+
+
+# /health is polled by load balancers and dashboards; cache the result briefly
+# so aggressive polling does not fan out to every MCP server on each hit.
+HEALTH_CACHE_TTL_SECONDS = 1.0
+HEALTH_CHECK_TIMEOUT_SECONDS = 1.5
+_health_cache: Dict[str, Any] = {"client": None, "expires_at": 0.0, "payload": None}
 
 
 @app.get("/health")
 @handle_errors()
 @trace_function()
-async def health():
+async def health(request: Request):
     """Detailed health check including MCP server connectivity."""
-    mcp_client = get_mcp_client()
+    mcp_client = request.app.state.mcp_client
     
     # Check if MCP client is connected
-    if not mcp_client or not hasattr(mcp_client, 'is_connected') or not mcp_client.is_connected():
+    if not mcp_client or not mcp_client.is_connected():
         from error_handling import KYCError, ErrorCode
         raise KYCError(
             code=ErrorCode.SERVICE_UNAVAILABLE,
@@ -198,15 +199,30 @@ async def health():
             details={"service": "MCP Client"}
         )
     
-    return {
-        "status": "healthy",
+    now = time.monotonic()
+    if _health_cache["client"] is mcp_client and now < _health_cache["expires_at"]:
+        return _health_cache["payload"]
+    
+    # All servers are probed concurrently, so latency is max(checks) rather than sum(checks)
+    server_health = await mcp_client.get_server_health(timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+    
+    payload = {
+        "status": "healthy" if all(server_health.values()) else "degraded",
         "service": SERVICE_NAME,
         "version": VERSION,
         "mcp_connected": True,
-        "mcp_client": "connected"
+        "mcp_client": "connected",
+        "mcp_servers": server_health
     }
+    _health_cache.update(client=mcp_client, expires_at=now + HEALTH_CACHE_TTL_SECONDS, payload=payload)
+    return payload
 
 
+# Performance note: /chat wall-clock time is dominated by network I/O (Azure OpenAI
+# calls and MCP tool calls), not by Python CPU work. Speedups come from overlapping
+# that I/O (shared connection pools, concurrent tool batches) and keeping the event
+# loop free, not from vectorizing or compiling Python code. The one CPU-heavy step,
+# serializing session history, runs off the loop in the session store.
 @app.post("/chat", response_model=ChatResponse)
 @handle_errors()
 @trace_function(attributes={"component": "chat_endpoint"})
@@ -223,8 +239,10 @@ async def chat(request: ChatRequest):
         span.set_attribute("session_id", session_id)
         span.set_attribute("has_session_id", bool(request.session_id))
         
-        if session_id not in sessions:
-            sessions[session_id] = {
+        session_store = app.state.session_store
+        session = await session_store.get(session_id)
+        if session is None:
+            session = {
                 "id": session_id,
                 "status": "active",
                 "customer": {},
@@ -233,18 +251,19 @@ async def chat(request: ChatRequest):
                 "step_results": {}
             }
         
-        session = sessions[session_id]
+        message = request.message
+        messages = session["messages"]
         
         # Add user message to history
-        session["messages"].append({
+        messages.append({
             "role": "user",
-            "content": request.message,
-            "timestamp": str(asyncio.get_event_loop().time())
+            "content": message,
+            "timestamp": time.monotonic()
         })
         
         # Prepare graph input
         graph_input = {
-            "messages": [HumanMessage(content=request.message)],
+            "messages": [HumanMessage(content=message)],
             "customer_data": session["customer"],
             "next_step": session["current_step"],
             "step_results": session["step_results"],
@@ -262,37 +281,51 @@ async def chat(request: ChatRequest):
         ai_response = result.get("final_response", "I'm processing your request...")
         
         # Update session
-        session["customer"] = result.get("customer_data", {})
-        session["current_step"] = result.get("next_step", "intake")
+        customer = result.get("customer_data", {})
+        current_step = result.get("next_step", "intake")
+        session["customer"] = customer
+        session["current_step"] = current_step
         session["step_results"] = result.get("step_results", {})
-        session["messages"].append({
+        messages.append({
             "role": "assistant",
             "content": ai_response,
-            "timestamp": str(asyncio.get_event_loop().time())
+            "timestamp": time.monotonic()
         })
         
-        # Save sessions
-        save_sessions(sessions)
+        # Save the session
+        await session_store.save(session)
         
         # Add trace attributes
         span.set_attribute("response_length", len(ai_response))
-        span.set_attribute("current_step", session["current_step"])
+        span.set_attribute("current_step", current_step)
         
         return ChatResponse(
             response=ai_response,
             session_id=session_id,
             status=session["status"],
-            current_step=session["current_step"],
-            customer=session["customer"]
+            current_step=current_step,
+            customer=customer
         )
 
 
 @app.get("/sessions")
 @handle_errors()
 @trace_function()
-async def list_sessions():
-    """List all active sessions."""
-    return {"sessions": list(sessions.values())}
+async def list_sessions(full: bool = False):
+    """List all active sessions as summaries; pass full=true for complete session data."""
+    sessions = await app.state.session_store.list()
+    if full:
+        return {"sessions": sessions}
+    return {"sessions": [
+        {
+            "id": s["id"],
+            "status": s["status"],
+            "current_step": s["current_step"],
+            "message_count": len(s["messages"]),
+            "updated": s["messages"][-1]["timestamp"] if s["messages"] else None
+        }
+        for s in sessions
+    ]}
 
 
 @app.get("/session/{session_id}")
@@ -300,9 +333,10 @@ async def list_sessions():
 @trace_function(attributes={"component": "get_session"})
 async def get_session(session_id: str):
     """Get session details."""
-    if session_id not in sessions:
+    session = await app.state.session_store.get(session_id)
+    if session is None:
         raise NotFoundError(resource="Session", id=session_id, message="Session not found")
-    return sessions[session_id]
+    return session
 
 
 @app.delete("/session/{session_id}")
@@ -310,9 +344,7 @@ async def get_session(session_id: str):
 @trace_function(attributes={"component": "delete_session"})
 async def delete_session(session_id: str):
     """Delete a session."""
-    if session_id in sessions:
-        del sessions[session_id]
-        save_sessions(sessions)
+    if await app.state.session_store.delete(session_id):
         return {"deleted": True, "session_id": session_id}
     raise NotFoundError(resource="Session", id=session_id, message="Session not found")
 
@@ -320,28 +352,14 @@ async def delete_session(session_id: str):
 @app.get("/mcp/tools")
 @handle_errors()
 @trace_function(attributes={"component": "list_mcp_tools"})
-async def list_mcp_tools():
+async def list_mcp_tools(request: Request):
     """List all available MCP tools from HTTP servers."""
-    mcp_client = get_mcp_client()
-    if not mcp_client or not hasattr(mcp_client, 'get_tools'):
+    mcp_client = request.app.state.mcp_client
+    if not mcp_client:
         raise ServiceUnavailableError("MCP Client", "MCP client is not available")
-        
-    tools = await mcp_client.get_tools()
     
-    # Serialize tools to dict format
-    tools_data = []
-    for tool in tools:
-        tool_info = {
-            "name": tool.name,
-            "description": tool.description,
-        }
-        # Add input schema if available
-        if hasattr(tool, 'args_schema') and tool.args_schema:
-            try:
-                tool_info["input_schema"] = tool.args_schema.model_json_schema()
-            except:
-                pass
-        tools_data.append(tool_info)
+    # Serialized once per client initialization
+    tools_data = mcp_client.cached_tools_metadata()
     
     return {
         "total_tools": len(tools_data),
@@ -350,20 +368,13 @@ async def list_mcp_tools():
 
 
 @app.get("/mcp/servers")
-@handle_errors()
 @trace_function(attributes={"component": "list_mcp_servers"})
 async def list_mcp_servers():
     """List MCP server configuration."""
-    return {
-        "servers": {
-            "postgres": os.getenv("MCP_POSTGRES_URL", "http://127.0.0.1:8001/mcp"),
-            "blob": os.getenv("MCP_BLOB_URL", "http://127.0.0.1:8002/mcp"),
-            "email": os.getenv("MCP_EMAIL_URL", "http://127.0.0.1:8003/mcp"),
-            "rag": os.getenv("MCP_RAG_URL", "http://127.0.0.1:8004/mcp"),
-        }
-    }
+    return Response(content=MCP_SERVERS_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop and httptools are installed with uvicorn[standard]
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
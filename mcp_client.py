@@ -10,9 +10,10 @@ a unified interface for agents to call tools.
 import os
 import asyncio
 import logging
+import threading
 import httpx
 from datetime import timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from aiobreaker import CircuitBreaker, CircuitBreakerError
 from error_handling import get_tracer
@@ -20,6 +21,24 @@ from error_handling import get_tracer
 logger = logging.getLogger("kyc.mcp_client")
 
 
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests to a long-lived pooled transport.
+    
+    The MCP streamable HTTP client closes its httpx client at the end of every
+    session; ignoring aclose() here keeps the shared connection pool alive.
+    """
+    
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        pass
+
+
 class KYCMCPClient:
     """
     Client for connecting to HTTP MCP servers.
@@ -44,27 +63,44 @@ class KYCMCPClient:
             email_url: URL for Email MCP server
             rag_url: URL for RAG MCP server
         """
+        # One keep-alive connection pool shared by all four servers for the app's lifetime.
+        # HTTP/2 is negotiated via TLS ALPN, so it only applies to https:// server URLs;
+        # uvicorn speaks HTTP/1.1 only, and plain http:// connections stay HTTP/1.1 with keep-alive.
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "1000")),
+                max_keepalive_connections=int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "100")),
+            ),
+        )
+        
         self.server_config = {
             "postgres": {
                 "transport": "streamable_http",
                 "url": postgres_url,
+                "httpx_client_factory": self._httpx_client_factory,
             },
             "blob": {
                 "transport": "streamable_http",
                 "url": blob_url,
+                "httpx_client_factory": self._httpx_client_factory,
             },
             "email": {
                 "transport": "streamable_http",
                 "url": email_url,
+                "httpx_client_factory": self._httpx_client_factory,
             },
             "rag": {
                 "transport": "streamable_http",
                 "url": rag_url,
+                "httpx_client_factory": self._httpx_client_factory,
             }
         }
         
         self._client: Optional[MultiServerMCPClient] = None
         self._tools: Optional[List] = None
+        self._tools_metadata: Optional[List[Dict[str, Any]]] = None
+        self._tools_metadata_lock = threading.Lock()
         self._connected: bool = False
         self._http_client: Optional[httpx.AsyncClient] = None
         
@@ -75,6 +111,21 @@ class KYCMCPClient:
             name="mcp_tool_calls"
         )
     
+    def _httpx_client_factory(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None,
+    ) -> httpx.AsyncClient:
+        """Create an httpx client for an MCP session backed by the shared connection pool."""
+        return httpx.AsyncClient(
+            transport=_SharedTransport(self._transport),
+            headers=headers,
+            timeout=timeout or httpx.Timeout(30.0),
+            auth=auth,
+            follow_redirects=True,
+        )
+    
     async def initialize(self):
         """
         Initialize connection to all MCP servers.
@@ -82,8 +133,8 @@ class KYCMCPClient:
         This method:
         1. Creates an HTTP client for health check requests
         2. Initializes the MultiServerMCPClient with all 4 server configs
-        3. Loads all available tools from connected servers
-        4. Normalizes tool names with server prefixes (e.g., "postgres__get_customer_by_email")
+        3. Loads all available tools from connected servers (one concurrent request per server)
+        4. Prefixes tool names with the server they came from (e.g., "postgres__get_customer_by_email")
         5. Sets the connected flag to True
         
         Must be called before using get_tools() or call_tool().
@@ -91,72 +142,38 @@ class KYCMCPClient:
         logger.info("Initializing HTTP MCP client connections...")
         
         # Create HTTP client for health checks (10s timeout for initial connections)
-        self._http_client = httpx.AsyncClient(timeout=10.0)
+        self._http_client = httpx.AsyncClient(transport=_SharedTransport(self._transport), timeout=10.0)
         
         # Initialize the multi-server client that manages all 4 MCP server connections
         self._client = MultiServerMCPClient(self.server_config)
         
-        # Load all tools from all connected servers
-        raw_tools = await self._client.get_tools()
-        
-        # Normalize tool names with server prefixes so tests and agents can target specific servers
-        # This ensures consistent naming across the system (e.g., "get_customer_by_email" becomes "postgres__get_customer_by_email")
-        server_tool_index = {
-            "postgres": {
-                "get_customer_by_email",
-                "get_customer_history",
-                "get_previous_kyc_sessions",
-                "save_kyc_session_state",
-                "load_kyc_session_state",
-                "delete_kyc_session",
-            },
-            "blob": {
-                "list_customer_documents",
-                "get_document_url",
-                "upload_document",
-                "get_document_metadata",
-                "delete_document",
-            },
-            "email": {
-                "send_kyc_approved_email",
-                "send_kyc_pending_email",
-                "send_kyc_rejected_email",
-            },
-            "rag": {
-                "search_policies",
-                "get_policy_requirements",
-                "check_compliance",
-                "list_policy_categories",
-                "delete_policy_document",
-            },
-        }
+        # Load tools from all servers concurrently, so startup waits for the slowest
+        # server rather than the sum of all four
+        server_names = list(self.server_config)
+        tools_per_server = await asyncio.gather(
+            *(self._client.get_tools(server_name=name) for name in server_names)
+        )
         
-        # Prefix each tool with its server name for clarity and consistency
+        # Prefix each tool with the server it was loaded from so tests and agents can target
+        # specific servers (e.g., "get_customer_by_email" becomes "postgres__get_customer_by_email")
         prefixed_tools = []
-        for tool in raw_tools:
-            name = getattr(tool, "name", "")
-            # Extract base name (remove any existing prefix)
-            base = name.split("__")[-1] if "__" in name else name
-            
-            # Find which server this tool belongs to by matching base name
-            server_match = None
-            for server, names in server_tool_index.items():
-                if base in names:
-                    server_match = server
-                    break
-            
-            # Add server prefix if not already present
-            if server_match and not name.startswith(server_match + "__"):
-                # Mutate name to include server prefix for test consistency
-                try:
-                    setattr(tool, "name", f"{server_match}__{base}")
-                except Exception:
-                    # Some tools may have read-only names, just skip
-                    pass
-            prefixed_tools.append(tool)
-        
-        # Store the prefixed tools list
+        for server_name, tools in zip(server_names, tools_per_server):
+            for tool in tools:
+                name = getattr(tool, "name", "")
+                # Extract base name (remove any existing prefix)
+                base = name.split("__")[-1]
+                if name != f"{server_name}__{base}":
+                    try:
+                        setattr(tool, "name", f"{server_name}__{base}")
+                    except Exception:
+                        # Some tools may have read-only names, just skip
+                        pass
+                prefixed_tools.append(tool)
+        
+        # Store the prefixed tools list and rebuild the serialized metadata for it
         self._tools = prefixed_tools
+        with self._tools_metadata_lock:
+            self._tools_metadata = self._serialize_tools(prefixed_tools)
         self._connected = True
         logger.info(f"Connected to MCP servers. Loaded {len(self._tools)} tools.")
     
@@ -181,6 +198,47 @@ class KYCMCPClient:
             span.set_attribute("mcp.tool_count", len(self._tools) if self._tools else 0)
             return self._tools
     
+    @staticmethod
+    def _serialize_tools(tools: List) -> List[Dict[str, Any]]:
+        """Serialize tools to name/description/input_schema dicts."""
+        tools_data = []
+        for tool in tools:
+            tool_info = {
+                "name": tool.name,
+                "description": tool.description,
+            }
+            # Add input schema if available
+            if hasattr(tool, 'args_schema') and tool.args_schema:
+                try:
+                    tool_info["input_schema"] = tool.args_schema.model_json_schema()
+                except Exception:
+                    pass
+            tools_data.append(tool_info)
+        return tools_data
+    
+    def cached_tools_metadata(self) -> List[Dict[str, Any]]:
+        """
+        Get serialized metadata for all tools.
+        
+        The list is built once per initialize() because walking every tool's
+        Pydantic schema is wasted work when the tool inventory does not change.
+        
+        Returns:
+            List of dicts with name, description and (if available) input_schema
+            
+        Raises:
+            RuntimeError: If client is not initialized
+        """
+        metadata = self._tools_metadata
+        if metadata is not None:
+            return metadata
+        if self._tools is None:
+            raise RuntimeError("Client not initialized. Call initialize() first.")
+        with self._tools_metadata_lock:
+            if self._tools_metadata is None:
+                self._tools_metadata = self._serialize_tools(self._tools)
+            return self._tools_metadata
+    
     def get_tools_for_server(self, server_name: str) -> List:
         """
         Get tools for a specific server only.
@@ -201,16 +259,21 @@ class KYCMCPClient:
             raise RuntimeError("Client not initialized. Call initialize() first.")
         return [tool for tool in self._tools if getattr(tool, "name", "").startswith(f"{server_name}__")]
     
-    async def get_server_health(self) -> Dict[str, bool]:
+    async def get_server_health(self, timeout: float = 5.0) -> Dict[str, bool]:
         """
         Check health of each MCP server independently.
         
         This method:
-        1. Iterates through all 4 configured servers (postgres, blob, email, rag)
-        2. Makes HTTP GET request to each server's /health endpoint
-        3. Sets 5-second timeout for each health check
-        4. Returns status based on HTTP 200 response
-        5. Gracefully handles failures (network errors, timeouts) by marking as unhealthy
+        1. Issues HTTP GET requests to every configured server's /health endpoint concurrently
+        2. Applies the given timeout (default 5 seconds) to each health check
+        3. Returns status based on HTTP 200 response
+        4. Gracefully handles failures (network errors, timeouts) by marking as unhealthy
+        
+        Because the checks run in parallel, total latency is that of the slowest
+        server rather than the sum of all four.
+        
+        Args:
+            timeout: Per-server request timeout in seconds
         
         Returns:
             Dict mapping server names to health status (True=healthy, False=unhealthy)
@@ -222,24 +285,24 @@ class KYCMCPClient:
         if not self._http_client:
             raise RuntimeError("Client not initialized. Call initialize() first.")
         
-        health = {}
-        for server_name, config in self.server_config.items():
+        async def check(server_name: str, config: Dict[str, Any]) -> bool:
             try:
-                # Extract base URL and construct health endpoint
                 # Replace /mcp path with /health (e.g., http://127.0.0.1:8001/mcp -> http://127.0.0.1:8001/health)
                 url = config["url"].replace("/mcp", "/health")
-                
-                # Make health check request with 5-second timeout
-                response = await self._http_client.get(url, timeout=5.0)
+                response = await self._http_client.get(url, timeout=timeout)
                 
                 # Server is healthy if it returns HTTP 200
-                health[server_name] = response.status_code == 200
+                return response.status_code == 200
             except Exception as e:
                 # Log warning but don't crash - health check failures are non-fatal
                 logger.warning(f"Health check failed for {server_name}: {e}")
-                health[server_name] = False
+                return False
         
-        return health
+        names = list(self.server_config)
+        results = await asyncio.gather(
+            *(check(name, self.server_config[name]) for name in names)
+        )
+        return dict(zip(names, results))
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
@@ -318,6 +381,25 @@ class KYCMCPClient:
                 logger.error(f"Tool call failed: {tool_name}", exc_info=True)
                 raise
     
+    async def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Call several tools concurrently.
+        
+        All calls are submitted at once over the shared connection pool, so a batch
+        takes about as long as its slowest call. Each call still goes through
+        call_tool (circuit breaker and tracing).
+        
+        Args:
+            calls: List of (tool_name, arguments) pairs
+            
+        Returns:
+            Results in the same order as calls; a failed call's entry is the exception it raised
+        """
+        return await asyncio.gather(
+            *(self.call_tool(tool_name, arguments) for tool_name, arguments in calls),
+            return_exceptions=True
+        )
+    
     async def close(self):
         """
         Close connections to all MCP servers and cleanup resources.
@@ -325,7 +407,8 @@ class KYCMCPClient:
         This method:
         1. Closes the MultiServerMCPClient (which handles cleanup of all 4 server connections)
         2. Closes the HTTP client used for health checks
-        3. Sets the connected flag to False
+        3. Closes the shared connection pool used by all MCP sessions
+        4. Sets the connected flag to False
         
         Should be called during application shutdown to ensure graceful cleanup.
         """
@@ -338,6 +421,9 @@ class KYCMCPClient:
             await self._http_client.aclose()
             self._http_client = None
         
+        # Close the pooled connections shared by all MCP sessions
+        await self._transport.aclose()
+        
         self._connected = False
 
     def is_connected(self) -> bool:
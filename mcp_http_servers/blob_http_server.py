@@ -8,8 +8,10 @@ Server listens on http://127.0.0.1:8002/mcp
 """
 import os
 import base64
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import httpx
 from pathlib import Path
@@ -17,7 +19,8 @@ from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 
 try:
-    from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions, ContentSettings
+    from azure.storage.blob import generate_blob_sas, BlobSasPermissions, ContentSettings
+    from azure.storage.blob.aio import BlobServiceClient, ContainerClient
     from azure.core.exceptions import ResourceNotFoundError
     AZURE_BLOB_AVAILABLE = True
 except ImportError:
@@ -41,13 +44,35 @@ async def health_check(request):
     })
 
 
-# Global client
+# Base64 payloads above this size are decoded in a worker thread so the event loop stays free
+LARGE_UPLOAD_BYTES = 1024 * 1024
+
+# Parallel block uploads per document for large files
+UPLOAD_MAX_CONCURRENCY = 4
+
+# Azure returns at most 5000 blobs per listing request
+MAX_PAGE_SIZE = 5000
+
+# Global async client, shared by all tool calls and closed on server shutdown
 _client = None
+_container_client = None
 _container_name = os.getenv("AZURE_BLOB_CONTAINER", "kyc-documents")
 _connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 
 
-def get_client():
+def _parse_connection_string(connection_string: Optional[str]) -> tuple:
+    """Extract (account_name, account_key) from a storage connection string."""
+    parts = dict(
+        part.split("=", 1) for part in (connection_string or "").split(";") if "=" in part
+    )
+    return parts.get("AccountName"), parts.get("AccountKey")
+
+
+# Parsed once; only needed to sign SAS URLs
+_account_name, _account_key = _parse_connection_string(_connection_string)
+
+
+def get_client() -> "BlobServiceClient":
     """Get or create blob service client."""
     global _client
     if _client is None:
@@ -57,54 +82,81 @@ def get_client():
     return _client
 
 
+def get_container_client() -> "ContainerClient":
+    """Get or create the container client for the KYC documents container."""
+    global _container_client
+    if _container_client is None:
+        _container_client = get_client().get_container_client(_container_name)
+    return _container_client
+
+
+async def close_client():
+    """Close the shared blob service client."""
+    global _client, _container_client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _container_client = None
+
+
 @mcp.tool()
-def list_customer_documents(account_id: str, document_type: Optional[str] = None) -> dict:
+async def list_customer_documents(
+    account_id: str,
+    document_type: Optional[str] = None,
+    page_size: Optional[int] = None,
+    continuation_token: Optional[str] = None
+) -> dict:
     """
-    List all documents for a customer from Azure Blob Storage.
+    List documents for a customer from Azure Blob Storage.
     Documents are stored in customers/Customer<account_id>/
+    
+    Without page_size every document is returned. With page_size, one page is
+    returned: while has_more is true, pass the returned continuation_token back
+    to fetch the next page.
     """
-    client = get_client()
-    container_client = client.get_container_client(_container_name)
+    container_client = get_container_client()
     
     customer_folder = f"customers/Customer{account_id}"
     prefix = f"{customer_folder}/"
     if document_type:
         prefix = f"{customer_folder}/{document_type}/"
     
-    documents = []
-    blobs = container_client.list_blobs(name_starts_with=prefix, include=["metadata"])
+    if page_size is not None:
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    pages = container_client.list_blobs(
+        name_starts_with=prefix, include=["metadata"], results_per_page=page_size
+    ).by_page(continuation_token=continuation_token)
     
-    for blob in blobs:
-        documents.append({
-            "name": blob.name,
-            "size": blob.size,
-            "created": blob.creation_time.isoformat() if blob.creation_time else None,
-            "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
-            "content_type": blob.content_settings.content_type if blob.content_settings else None,
-            "metadata": blob.metadata or {}
-        })
+    documents = []
+    async for page in pages:
+        async for blob in page:
+            documents.append({
+                "name": blob.name,
+                "size": blob.size,
+                "created": blob.creation_time.isoformat() if blob.creation_time else None,
+                "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
+                "content_type": blob.content_settings.content_type if blob.content_settings else None,
+                "metadata": blob.metadata or {}
+            })
+        if page_size is not None:
+            break
+    # Empty once the listing is exhausted
+    next_token = pages.continuation_token or None
     
     return {
         "account_id": account_id,
         "folder": customer_folder,
         "document_count": len(documents),
-        "documents": documents
+        "documents": documents,
+        "has_more": next_token is not None,
+        "continuation_token": next_token
     }
 
 
 @mcp.tool()
 def get_document_url(blob_path: str, expiry_hours: int = 1) -> dict:
     """Get a temporary SAS URL for downloading a document."""
-    # Parse account info from connection string
-    account_name = None
-    account_key = None
-    
-    for part in _connection_string.split(";"):
-        if part.startswith("AccountName="):
-            account_name = part.split("=", 1)[1]
-        elif part.startswith("AccountKey="):
-            account_key = part.split("=", 1)[1]
-    
+    account_name, account_key = _account_name, _account_key
     if not account_name or not account_key:
         raise ValueError("Could not parse storage account credentials")
     
@@ -128,7 +180,7 @@ def get_document_url(blob_path: str, expiry_hours: int = 1) -> dict:
 
 
 @mcp.tool()
-def upload_document(
+async def upload_document(
     account_id: str,
     filename: str,
     content_base64: str,
@@ -140,15 +192,17 @@ def upload_document(
     Upload a document to Azure Blob Storage.
     Documents are stored in customers/Customer<account_id>/document_type/
     """
-    client = get_client()
-    container_client = client.get_container_client(_container_name)
+    container_client = get_container_client()
     
     # Build blob path
     customer_folder = f"customers/Customer{account_id}"
     blob_path = f"{customer_folder}/{document_type}/{filename}"
     
     # Decode content
-    content = base64.b64decode(content_base64)
+    if len(content_base64) > LARGE_UPLOAD_BYTES:
+        content = await asyncio.to_thread(base64.b64decode, content_base64)
+    else:
+        content = base64.b64decode(content_base64)
     
     # Prepare metadata
     meta = metadata or {}
@@ -157,11 +211,12 @@ def upload_document(
     
     # Upload
     blob_client = container_client.get_blob_client(blob_path)
-    blob_client.upload_blob(
+    await blob_client.upload_blob(
         content,
         overwrite=True,
         content_settings=ContentSettings(content_type=content_type),
-        metadata=meta
+        metadata=meta,
+        max_concurrency=UPLOAD_MAX_CONCURRENCY
     )
     
     return {
@@ -172,14 +227,13 @@ def upload_document(
 
 
 @mcp.tool()
-def get_document_metadata(blob_path: str) -> dict:
+async def get_document_metadata(blob_path: str) -> dict:
     """Get metadata for a document without downloading it."""
-    client = get_client()
-    container_client = client.get_container_client(_container_name)
+    container_client = get_container_client()
     
     try:
         blob_client = container_client.get_blob_client(blob_path)
-        properties = blob_client.get_blob_properties()
+        properties = await blob_client.get_blob_properties()
         
         return {
             "found": True,
@@ -195,14 +249,13 @@ def get_document_metadata(blob_path: str) -> dict:
 
 
 @mcp.tool()
-def delete_document(blob_path: str) -> dict:
+async def delete_document(blob_path: str) -> dict:
     """Delete a document from Azure Blob Storage (for cleanup/testing)."""
-    client = get_client()
-    container_client = client.get_container_client(_container_name)
+    container_client = get_container_client()
     
     try:
         blob_client = container_client.get_blob_client(blob_path)
-        blob_client.delete_blob()
+        await blob_client.delete_blob()
         return {"deleted": True, "blob_path": blob_path}
     except ResourceNotFoundError:
         return {"deleted": False, "message": "Document not found"}
@@ -312,7 +365,22 @@ def convert_url_to_markdown(url: str, timeout_seconds: int = 30) -> dict:
         }
 
 
+def create_app():
+    """Build the streamable HTTP app, closing the blob client when it shuts down."""
+    app = mcp.streamable_http_app()
+    session_manager_lifespan = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with session_manager_lifespan(app):
+            yield
+        await close_client()
+    
+    app.router.lifespan_context = lifespan
+    return app
+
+
 if __name__ == "__main__":
     # Start the HTTP server on port 8002
     import uvicorn
-    uvicorn.run(mcp.streamable_http_app, host="127.0.0.1", port=8002)
+    uvicorn.run(create_app, factory=True, host="127.0.0.1", port=8002)
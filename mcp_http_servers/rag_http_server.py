@@ -8,9 +8,15 @@ Server listens on http://127.0.0.1:8004/mcp
 """
 import os
 import asyncio
-from typing import Optional, List
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, List, Set, Tuple
 from dotenv import load_dotenv
 import asyncpg
+import httpx
+from pgvector.asyncpg import register_vector
 from langchain_openai import AzureOpenAIEmbeddings
 
 from mcp.server.fastmcp import FastMCP
@@ -18,12 +24,80 @@ from mcp.server.fastmcp import FastMCP
 # Load environment variables
 load_dotenv()
 
-# Create FastMCP server with JSON response mode
-mcp = FastMCP("RAGKYC", json_response=True)
 
-# Global connection pool and embeddings
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Connection settings for Postgres and Azure OpenAI, read once from the environment."""
+    postgres_host: str
+    postgres_port: int
+    postgres_db: str
+    postgres_user: str
+    postgres_password: str
+    pool_min_size: int
+    pool_max_size: int
+    embedding_deployment: str
+    azure_endpoint: str
+    azure_api_key: str
+    azure_api_version: str
+    
+    @classmethod
+    def from_env(cls) -> "Config":
+        return cls(
+            postgres_host=os.getenv("POSTGRES_HOST", "localhost"),
+            postgres_port=int(os.getenv("POSTGRES_PORT", "5432")),
+            postgres_db=os.getenv("POSTGRES_DB", "kyc_crm"),
+            postgres_user=os.getenv("POSTGRES_USER", "postgres"),
+            postgres_password=os.getenv("POSTGRES_PASSWORD", ""),
+            pool_min_size=int(os.getenv("PG_POOL_MIN", "10")),
+            pool_max_size=int(os.getenv("PG_POOL_MAX", "50")),
+            embedding_deployment=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""),
+            azure_api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
+            azure_api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
+        )
+
+
+CONFIG = Config.from_env()
+
+# Create FastMCP server with JSON response mode. Stateless, so any worker
+# process can serve any request when running with WEB_CONCURRENCY > 1
+mcp = FastMCP("RAGKYC", json_response=True, stateless_http=True)
+
+# Global connection pool, embeddings and shared Azure OpenAI HTTP client
 _pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()  # Stops concurrent first calls from creating two pools
 _embeddings: Optional[AzureOpenAIEmbeddings] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+# LRU cache of query embeddings, keyed by a digest of the query text
+EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "1024"))
+_embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+
+# Concurrent cache misses are sent to Azure OpenAI together, up to this many per request
+EMBEDDING_BATCH_SIZE = 16
+EMBEDDING_BATCH_WAIT_SECONDS = 0.01
+
+# ANN search recall/speed trade-off, applied to every pooled connection
+IVFFLAT_PROBES = int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "40"))
+# pgvector >= 0.8: keep scanning the index until filtered queries fill their LIMIT
+# (e.g. "relaxed_order"); unset leaves the server default
+ITERATIVE_SCAN = os.getenv("RAG_ITERATIVE_SCAN")
+# Sent as connection startup parameters rather than SET in the pool's init:
+# asyncpg runs RESET ALL whenever a connection is released, which restores
+# startup values but would wipe anything SET after connecting
+PG_SERVER_SETTINGS = {
+    "ivfflat.probes": str(IVFFLAT_PROBES),
+    "hnsw.ef_search": str(HNSW_EF_SEARCH),
+}
+if ITERATIVE_SCAN:
+    PG_SERVER_SETTINGS["hnsw.iterative_scan"] = ITERATIVE_SCAN
+    PG_SERVER_SETTINGS["ivfflat.iterative_scan"] = ITERATIVE_SCAN
+
+# Search the FP16 copy of the embeddings (see datamodel/migration_add_halfvec_embedding.sql)
+# and rerank the candidates by exact float32 distance
+USE_HALFVEC = os.getenv("RAG_USE_HALFVEC", "false").lower() == "true"
+RERANK_FACTOR = 4  # Halfvec candidates fetched per requested result
 
 
 @mcp.custom_route("/health", methods=["GET"])
@@ -37,31 +111,145 @@ async def health_check(request):
     })
 
 
+def similarity_search_sql(columns: str, where: str, limit: str) -> str:
+    """
+    Build a nearest-neighbour query over policy_documents.
+    
+    Embeddings are unit length, so rows are ranked by negative inner product (<#>),
+    which equals cosine ranking without the per-row norm computation; callers
+    report cosine similarity as -distance.
+    $1 is always the query embedding. With RAG_USE_HALFVEC the halfvec index
+    picks limit * RERANK_FACTOR candidates, which are then ordered by exact
+    float32 distance so quantization does not change the returned ranking.
+    
+    Args:
+        columns: Columns to return (a distance column is added)
+        where: WHERE clause condition
+        limit: LIMIT expression (literal or parameter)
+        
+    Returns:
+        str: SQL query
+    """
+    if not USE_HALFVEC:
+        ranking = f"""
+            SELECT id, embedding <#> $1::vector as distance
+            FROM policy_documents
+            WHERE {where}
+            ORDER BY distance
+            LIMIT {limit}
+        """
+    else:
+        ranking = f"""
+            SELECT id, embedding <#> $1::vector as distance
+            FROM (
+                SELECT id, embedding FROM policy_documents
+                WHERE {where}
+                ORDER BY embedding_half <#> $1::vector::halfvec(1536)
+                LIMIT {limit} * {RERANK_FACTOR}
+            ) candidates
+            ORDER BY distance
+            LIMIT {limit}
+        """
+    # Rank on ids only, then read the (possibly large, TOASTed) content for the kept rows
+    return f"""
+        WITH top AS ({ranking})
+        SELECT {columns}, distance
+        FROM top JOIN policy_documents USING (id)
+        ORDER BY distance
+    """
+
+
+# SQL is built once at import, so every call sends identical text and hits
+# asyncpg's per-connection prepared statement cache (parsed and planned once)
+# $2 is the optional category filter (NULL searches every category)
+SQL_SEARCH_POLICIES = similarity_search_sql(
+    "id, filename, category, content, chunk_index",
+    "($2::text IS NULL OR category = $2::text)",
+    "$3"
+)
+SQL_POLICY_REQUIREMENTS = similarity_search_sql(
+    "filename, content, chunk_index",
+    "category IN ('compliance', 'eligibility', 'requirements')",
+    "3"
+)
+SQL_COMPLIANCE_POLICIES = similarity_search_sql(
+    "filename, category, content",
+    "category IN ('compliance', 'aml', 'kyc', 'eligibility')",
+    "5"
+)
+
+
+async def init_connection(conn: asyncpg.Connection) -> None:
+    """Register the pgvector codec on a new pooled connection."""
+    await register_vector(conn)
+
+
 async def get_pool() -> asyncpg.Pool:
     """
     Get or create PostgreSQL connection pool for policy document database.
     
     Uses lazy initialization pattern - creates pool on first call and reuses it.
-    Pool maintains 2-10 connections for efficient database access with pgvector.
+    Pool size comes from PG_POOL_MIN / PG_POOL_MAX (default 10-50 connections).
+    The pool is created on the first tool call, which opens (and initializes)
+    min_size connections at once; later requests reuse them instead of paying
+    auth and codec setup each time.
+    Each connection registers the pgvector codec, so embeddings are passed as
+    binary float32 arrays rather than stringified lists.
     
     Returns:
         asyncpg.Pool: Connection pool for policy_documents table
     """
     global _pool
-    if _pool is None:
-        # Create connection pool with configuration from environment variables
-        _pool = await asyncpg.create_pool(
-            host=os.getenv("POSTGRES_HOST", "localhost"),
-            port=int(os.getenv("POSTGRES_PORT", "5432")),
-            database=os.getenv("POSTGRES_DB", "kyc_crm"),
-            user=os.getenv("POSTGRES_USER", "postgres"),
-            password=os.getenv("POSTGRES_PASSWORD", ""),
-            min_size=2,    # Minimum 2 connections always open
-            max_size=10,   # Maximum 10 concurrent connections
-        )
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                host=CONFIG.postgres_host,
+                port=CONFIG.postgres_port,
+                database=CONFIG.postgres_db,
+                user=CONFIG.postgres_user,
+                password=CONFIG.postgres_password,
+                min_size=CONFIG.pool_min_size,
+                max_size=CONFIG.pool_max_size,
+                max_inactive_connection_lifetime=300,  # Close any connection idle for 5 min (even below min_size; reopened on demand)
+                command_timeout=30,
+                server_settings=PG_SERVER_SETTINGS,  # ANN search settings, kept across RESET ALL
+                init=init_connection,  # pgvector binary codec
+            )
     return _pool
 
 
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared HTTP/2 client used for Azure OpenAI calls.
+    
+    One pooled client keeps TLS connections to Azure alive across embedding
+    requests, so concurrent calls multiplex over an existing connection instead
+    of paying a TCP+TLS handshake each time.
+    
+    Returns:
+        httpx.AsyncClient: Pooled HTTP/2 client
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP/2 client (the embeddings model is rebuilt on next use)."""
+    global _http_client, _embeddings
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _embeddings = None
+
+
 def get_embeddings() -> AzureOpenAIEmbeddings:
     """
     Get or create Azure OpenAI embeddings model for semantic search.
@@ -74,16 +262,109 @@ def get_embeddings() -> AzureOpenAIEmbeddings:
     """
     global _embeddings
     if _embeddings is None:
-        # Initialize Azure OpenAI embeddings with configuration from environment
         _embeddings = AzureOpenAIEmbeddings(
-            azure_deployment=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
+            azure_deployment=CONFIG.embedding_deployment,
+            azure_endpoint=CONFIG.azure_endpoint,
+            api_key=CONFIG.azure_api_key,
+            api_version=CONFIG.azure_api_version,
+            http_async_client=get_http_client(),
         )
     return _embeddings
 
 
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent embedding requests into batched Azure OpenAI calls.
+    
+    Requests are queued and sent as a single aembed_documents call once
+    EMBEDDING_BATCH_SIZE texts are waiting or EMBEDDING_BATCH_WAIT_SECONDS has
+    passed since the first one, so N concurrent queries cost one round-trip.
+    """
+    
+    def __init__(self, max_batch_size: int = EMBEDDING_BATCH_SIZE, max_wait: float = EMBEDDING_BATCH_WAIT_SECONDS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._requests: Set[asyncio.Task] = set()  # Keeps in-flight batches referenced
+    
+    async def embed(self, text: str) -> List[float]:
+        """Queue a text for embedding and wait for its vector."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._send_pending()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._send_after_wait())
+        return await future
+    
+    async def _send_after_wait(self) -> None:
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        self._send_pending()
+    
+    def _send_pending(self) -> None:
+        """Start a request for everything queued so far."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._requests.add(task)
+            task.add_done_callback(self._requests.discard)
+    
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await get_embeddings().aembed_documents([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(vector)
+
+
+_batcher: Optional[EmbeddingBatcher] = None
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """Get or create the shared embedding batcher."""
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbeddingBatcher()
+    return _batcher
+
+
+async def embed_query(text: str) -> List[float]:
+    """
+    Get the embedding for a query, reusing cached embeddings for repeated queries.
+    
+    Embeddings are stable for a given deployment, so a repeated query is served
+    from an in-process LRU cache instead of another round-trip to Azure OpenAI.
+    Cache misses go through the shared EmbeddingBatcher.
+    
+    Args:
+        text: Query text to embed
+        
+    Returns:
+        List[float]: Embedding vector for the query
+    """
+    key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    embedding = _embedding_cache.get(key)
+    if embedding is not None:
+        _embedding_cache.move_to_end(key)
+        return embedding
+    
+    embedding = await get_batcher().embed(text)
+    _embedding_cache[key] = embedding
+    if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+        _embedding_cache.popitem(last=False)  # Evict least recently used
+    return embedding
+
+
 @mcp.tool()
 async def search_policies(query: str, category: Optional[str] = None, limit: int = 5) -> dict:
     """
@@ -91,7 +372,8 @@ async def search_policies(query: str, category: Optional[str] = None, limit: int
     
     This tool:
     1. Converts the natural language query to a vector embedding
-    2. Uses pgvector's cosine similarity (<=> operator) to find similar document chunks
+    2. Uses pgvector's inner product (<#> operator, equal to cosine similarity for
+       normalized embeddings) to find similar document chunks
     3. Optionally filters by category (compliance, aml, kyc, eligibility, etc.)
     4. Returns top N most similar policy chunks with similarity scores
     
@@ -103,47 +385,26 @@ async def search_policies(query: str, category: Optional[str] = None, limit: int
     Returns:
         Dict with query info, result count, and list of matching policy chunks with similarity scores
     """
-    pool = await get_pool()
-    embeddings = get_embeddings()
-    
-    # Generate embedding vector for the query text using Azure OpenAI
-    query_embedding = await embeddings.aembed_query(query)
+    # Generate embedding vector for the query text using Azure OpenAI (cached),
+    # overlapping the round-trip with pool creation on the first call
+    pool, query_embedding = await asyncio.gather(get_pool(), embed_query(query))
     
     async with pool.acquire() as conn:
-        # Build query with optional category filter
-        if category:
-            # Search within specific category only
-            rows = await conn.fetch("""
-                SELECT 
-                    id, filename, category, content, chunk_index,
-                    1 - (embedding <=> $1::vector) as similarity
-                FROM policy_documents
-                WHERE category = $2
-                ORDER BY embedding <=> $1::vector
-                LIMIT $3
-            """, str(query_embedding), category, limit)
-        else:
-            # Search across all categories
-            rows = await conn.fetch("""
-                SELECT 
-                    id, filename, category, content, chunk_index,
-                    1 - (embedding <=> $1::vector) as similarity
-                FROM policy_documents
-                ORDER BY embedding <=> $1::vector
-                LIMIT $2
-            """, str(query_embedding), limit)
+        # Search within the category if given, otherwise across all categories
+        rows = await conn.fetch(SQL_SEARCH_POLICIES, query_embedding, category or None, limit)
         
         # Convert database rows to result dictionaries
+        # Rows are unpacked by position (column order of SQL_SEARCH_POLICIES)
         results = [
             {
-                "id": row["id"],
-                "filename": row["filename"],
-                "category": row["category"],
-                "content": row["content"],
-                "chunk_index": row["chunk_index"],
-                "similarity": float(row["similarity"])  # 0.0 to 1.0, higher is more similar
+                "id": id_,
+                "filename": filename,
+                "category": category_,
+                "content": content,
+                "chunk_index": chunk_index,
+                "similarity": -distance  # 0.0 to 1.0, higher is more similar
             }
-            for row in rows
+            for id_, filename, category_, content, chunk_index, distance in rows
         ]
     
     return {
@@ -176,37 +437,27 @@ async def get_policy_requirements(product_type: str, requirement_type: Optional[
     Returns:
         Dict with product info and list of relevant requirement chunks with similarity scores
     """
-    pool = await get_pool()
-    
     # Build semantic search query combining product and requirement types
     search_query = f"{product_type} policy requirements"
     if requirement_type:
         search_query += f" {requirement_type}"
     
-    # Convert query to embedding vector
-    embeddings = get_embeddings()
-    query_embedding = await embeddings.aembed_query(search_query)
+    # Convert query to embedding vector (cached) while the pool is fetched
+    pool, query_embedding = await asyncio.gather(get_pool(), embed_query(search_query))
     
     async with pool.acquire() as conn:
         # Search only in policy requirement categories
-        rows = await conn.fetch("""
-            SELECT filename, category, content, chunk_index,
-                   1 - (embedding <=> $1::vector) as similarity
-            FROM policy_documents
-            WHERE category IN ('compliance', 'eligibility', 'requirements')
-            ORDER BY embedding <=> $1::vector
-            LIMIT 3
-        """, str(query_embedding))
+        rows = await conn.fetch(SQL_POLICY_REQUIREMENTS, query_embedding)
         
         # Format results with source and similarity information
         requirements = [
             {
-                "source": row["filename"],
-                "content": row["content"],
-                "chunk_index": row["chunk_index"],
-                "similarity": float(row["similarity"])  # Higher score = more relevant
+                "source": filename,
+                "content": content,
+                "chunk_index": chunk_index,
+                "similarity": -distance  # Higher score = more relevant
             }
-            for row in rows
+            for filename, content, chunk_index, distance in rows
         ]
     
     return {
@@ -216,16 +467,72 @@ async def get_policy_requirements(product_type: str, requirement_type: Optional[
     }
 
 
+def assess_customer(
+    customer_data: dict,
+    product_type: str,
+    check_types: List[str],
+    relevant_policies: List[dict]
+) -> Tuple[List[dict], List[str]]:
+    """
+    Run the per-customer compliance checks (same rules as the stdio RAG server).
+    
+    Returns one result per check type (status PASS, REVIEW or FAIL, citing the retrieved
+    policies in that category) and the list of issues found.
+    """
+    checks = []
+    issues = []
+    for check_type in check_types:
+        check_result = {
+            "type": check_type,
+            "status": "PASS",
+            "policy_references": sorted({p["source"] for p in relevant_policies if p["category"] == check_type}),
+            "details": ""
+        }
+        
+        if check_type == "aml":
+            # AML check - consent required
+            if not customer_data.get("consent"):
+                check_result["status"] = "FAIL"
+                check_result["details"] = "Customer consent for background check not obtained"
+                issues.append("Missing AML consent")
+            else:
+                check_result["details"] = "AML consent obtained"
+        
+        elif check_type == "kyc":
+            # KYC check - identity verification
+            missing = []
+            if not customer_data.get("date_of_birth") and not customer_data.get("dob"):
+                missing.append("date of birth")
+            if not customer_data.get("address"):
+                missing.append("address")
+            
+            if missing:
+                check_result["status"] = "REVIEW"
+                check_result["details"] = f"Missing: {', '.join(missing)}"
+                issues.append(f"KYC incomplete: {', '.join(missing)}")
+            else:
+                check_result["details"] = "Identity information complete"
+        
+        elif check_type == "eligibility":
+            check_result["details"] = f"Eligibility check for {product_type} completed"
+        
+        checks.append(check_result)
+    
+    return checks, issues
+
+
 @mcp.tool()
 async def check_compliance(customer_data: dict, product_type: str, check_types: List[str] = ["aml", "kyc", "eligibility"]) -> dict:
     """
     Check if customer data meets policy compliance requirements.
     
     This tool:
-    1. Builds a customer profile summary including age, location, and product type
+    1. Builds a policy search query from the product type and check types
+       (customer details are not sent to the embedding model)
     2. Searches for relevant compliance, AML, KYC, and eligibility policies
     3. Returns matching policy chunks that apply to the customer situation
-    4. Performs a simple compliance check (production systems should use LLM interpretation)
+    4. Checks customer_data for each check type (AML consent, KYC date of birth and
+       address) and reports issues (production systems should use LLM interpretation)
     
     Check types:
     - aml: Anti-Money Laundering checks
@@ -233,55 +540,54 @@ async def check_compliance(customer_data: dict, product_type: str, check_types:
     - eligibility: Product eligibility criteria
     
     Args:
-        customer_data: Dict with customer info (e.g., {"age": 35, "location": "California", "income": 75000})
+        customer_data: Dict with customer info (e.g., {"consent": True, "date_of_birth": "1990-01-01", "address": "..."})
         product_type: Product customer is applying for (e.g., "home_insurance", "auto_insurance")
         check_types: List of compliance check types to perform (default: ["aml", "kyc", "eligibility"])
         
     Returns:
-        Dict with compliance status, checks performed, any issues found, and relevant policy excerpts
+        Dict with compliance status (PASS, REVIEW or FAIL), per-check results, any issues
+        found, and relevant policy excerpts
     """
-    pool = await get_pool()
-    embeddings = get_embeddings()
-    
-    # Build a natural language summary of the customer and their application
-    customer_summary = f"Customer applying for {product_type}: "
-    if "age" in customer_data:
-        customer_summary += f"age {customer_data['age']}, "
-    if "location" in customer_data:
-        customer_summary += f"location {customer_data['location']}, "
-    customer_summary += f"checks needed: {', '.join(check_types)}"
+    # Policy retrieval depends only on the product and checks, not on the customer's
+    # details, so the query stays PII-free and repeats hit the embedding cache.
+    # Sorted so the same checks in a different order produce the same query.
+    policy_query = f"{product_type} policy {' '.join(sorted(check_types))}"
     
-    # Convert customer summary to embedding for semantic search
-    query_embedding = await embeddings.aembed_query(customer_summary)
+    # Convert policy query to embedding for semantic search (cached) while the pool is fetched
+    pool, query_embedding = await asyncio.gather(get_pool(), embed_query(policy_query))
     
     async with pool.acquire() as conn:
         # Find policies relevant to this customer's compliance check
-        rows = await conn.fetch("""
-            SELECT filename, category, content,
-                   1 - (embedding <=> $1::vector) as similarity
-            FROM policy_documents
-            WHERE category IN ('compliance', 'aml', 'kyc', 'eligibility')
-            ORDER BY embedding <=> $1::vector
-            LIMIT 5
-        """, str(query_embedding))
+        rows = await conn.fetch(SQL_COMPLIANCE_POLICIES, query_embedding)
         
         # Format relevant policy excerpts
         relevant_policies = [
             {
-                "source": row["filename"],
-                "category": row["category"],
-                "content": row["content"],
-                "similarity": float(row["similarity"])  # How relevant this policy is to the customer
+                "source": filename,
+                "category": category,
+                "content": content,
+                "similarity": -distance  # How relevant this policy is to the customer
             }
-            for row in rows
+            for filename, category, content, distance in rows
         ]
     
-    # Simple compliance check logic
+    # Customer-specific checks run here, on customer_data and the retrieved policies
     # Note: Production systems should use an LLM to interpret policy text and make decisions
+    checks, issues = assess_customer(customer_data, product_type, check_types, relevant_policies)
+    
+    if any(check["status"] == "FAIL" for check in checks):
+        status = "FAIL"
+    elif any(check["status"] == "REVIEW" for check in checks):
+        status = "REVIEW"
+    else:
+        status = "PASS"
+    
     compliance_status = {
-        "compliant": True,  # Default to compliant (LLM would provide real assessment)
+        "compliant": status == "PASS",
+        "status": status,
         "checks_performed": check_types,
-        "issues": [],  # LLM would populate with specific compliance issues
+        "checks": checks,
+        "issues": issues,
         "relevant_policies": relevant_policies  # Policies that apply to this customer
     }
     
@@ -294,8 +600,9 @@ async def list_policy_categories() -> dict:
     List available policy document categories in the database.
     
     This tool:
-    1. Queries the database to get all unique policy categories
-    2. Counts how many document chunks exist in each category
+    1. Reads the policy_category_counts materialized view (kept up to date by a
+       trigger on policy_documents)
+    2. Gets how many document chunks exist in each category
     3. Returns a summary of available policy categories
     
     Use this to:
@@ -317,21 +624,20 @@ async def list_policy_categories() -> dict:
     pool = await get_pool()
     
     async with pool.acquire() as conn:
-        # Group by category and count document chunks in each
+        # Chunk counts are precomputed in the policy_category_counts materialized view
         rows = await conn.fetch("""
-            SELECT category, COUNT(*) as document_count
-            FROM policy_documents
-            GROUP BY category
+            SELECT category, document_count
+            FROM policy_category_counts
             ORDER BY category
         """)
         
         # Format category information
         categories = [
             {
-                "category": row["category"],
-                "document_count": row["document_count"]  # Number of chunks in this category
+                "category": category,
+                "document_count": document_count  # Number of chunks in this category
             }
-            for row in rows
+            for category, document_count in rows
         ]
     
     return {
@@ -341,13 +647,18 @@ async def list_policy_categories() -> dict:
 
 
 @mcp.tool()
-async def delete_policy_document(filename: Optional[str] = None, document_id: Optional[int] = None) -> dict:
+async def delete_policy_document(
+    filename: Optional[str] = None,
+    document_id: Optional[int] = None,
+    filenames: Optional[List[str]] = None,
+    document_ids: Optional[List[int]] = None
+) -> dict:
     """
-    Delete a policy document and its chunks from the database.
+    Delete policy documents and their chunks from the database.
     
     This tool:
-    1. Accepts either a filename or document ID to identify the document(s) to delete
-    2. Removes all matching rows from the policy_documents table
+    1. Accepts filenames and/or document IDs to identify the document(s) to delete
+    2. Removes all matching rows from the policy_documents table in one statement
     3. Returns the number of chunks deleted
     
     Use cases:
@@ -355,38 +666,45 @@ async def delete_policy_document(filename: Optional[str] = None, document_id: Op
     - Testing: Clear test data between test runs
     - Updates: Delete old versions before uploading new policy versions
     
-    Note: This deletes ALL chunks associated with the filename (if provided)
-    or the specific chunk by ID (if document_id provided).
+    Note: This deletes ALL chunks associated with each filename provided
+    and the specific chunks for each document ID provided. As before the bulk
+    arguments were added, filename takes precedence over document_id: when
+    both are given, document_id is ignored. The bulk lists are always applied
+    in addition (rows matching any filename or any ID are deleted).
     
     Args:
         filename: Optional filename to delete (removes ALL chunks from this file)
-        document_id: Optional specific document chunk ID to delete
+        document_id: Optional specific document chunk ID to delete (ignored when filename is given)
+        filenames: Optional list of filenames to delete in bulk
+        document_ids: Optional list of document chunk IDs to delete in bulk
         
     Returns:
         Dict with deletion status and count of deleted chunks
         
     Raises:
-        ValueError: If neither filename nor document_id is provided
+        ValueError: If no filename or document ID is provided
     """
-    pool = await get_pool()
+    # Merge single and bulk identifiers so everything is deleted in one round-trip
+    all_filenames = list(filenames or [])
+    all_document_ids = list(document_ids or [])
+    if filename is not None:
+        all_filenames.append(filename)
+    elif document_id is not None:
+        all_document_ids.append(document_id)
     
     # Validate that at least one identifier was provided
-    if not filename and not document_id:
-        raise ValueError("Either filename or document_id must be provided")
+    if not all_filenames and not all_document_ids:
+        raise ValueError("Either filename(s) or document_id(s) must be provided")
+    
+    pool = await get_pool()
     
     async with pool.acquire() as conn:
-        if filename:
-            # Delete all chunks from this file
-            result = await conn.execute(
-                "DELETE FROM policy_documents WHERE filename = $1",
-                filename
-            )
-        else:
-            # Delete specific chunk by ID
-            result = await conn.execute(
-                "DELETE FROM policy_documents WHERE id = $1",
-                document_id
-            )
+        # Arrays are sent as single binary parameters
+        result = await conn.execute(
+            "DELETE FROM policy_documents WHERE filename = ANY($1::text[]) OR id = ANY($2::bigint[])",
+            all_filenames,
+            all_document_ids
+        )
         
         # Extract number of deleted rows from result string (e.g., "DELETE 3")
         deleted_count = int(result.split()[-1]) if result else 0
@@ -395,11 +713,38 @@ async def delete_policy_document(filename: Optional[str] = None, document_id: Op
         "deleted": deleted_count > 0,
         "deleted_count": deleted_count,
         "filename": filename,
-        "document_id": document_id
+        "document_id": document_id,
+        "filenames": filenames,
+        "document_ids": document_ids
     }
 
 
+def create_app():
+    """Build the streamable HTTP app, closing the HTTP client when it shuts down."""
+    app = mcp.streamable_http_app()
+    session_manager_lifespan = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with session_manager_lifespan(app):
+            yield
+        await close_http_client()
+    
+    app.router.lifespan_context = lifespan
+    return app
+
+
 if __name__ == "__main__":
     # Start the HTTP server on port 8004
+    # uvloop and httptools are installed with uvicorn[standard]. Each worker has its own
+    # Postgres pool, so keep WEB_CONCURRENCY * PG_POOL_MAX under the server's max_connections.
     import uvicorn
-    uvicorn.run(mcp.streamable_http_app, host="127.0.0.1", port=8004)
+    uvicorn.run(
+        "mcp_http_servers.rag_http_server:create_app",
+        factory=True,
+        host="127.0.0.1",
+        port=8004,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -8,16 +8,24 @@ tools for agents to interact with external systems:
 - Azure Blob: Document storage and retrieval
 - Email: Customer notifications
 - RAG: Policy compliance via vector search
+
+Server classes are imported on first access, so importing a helper module
+(e.g. mcp_servers.chunking) does not load every server's SDK dependencies.
 """
 
-from mcp_servers.postgres_server import PostgresMCPServer
-from mcp_servers.blob_server import BlobMCPServer
-from mcp_servers.email_server import EmailMCPServer
-from mcp_servers.rag_server import RAGMCPServer
-
-__all__ = [
-    "PostgresMCPServer",
-    "BlobMCPServer",
-    "EmailMCPServer",
-    "RAGMCPServer",
-]
+import importlib
+
+_SERVER_MODULES = {
+    "PostgresMCPServer": "mcp_servers.postgres_server",
+    "BlobMCPServer": "mcp_servers.blob_server",
+    "EmailMCPServer": "mcp_servers.email_server",
+    "RAGMCPServer": "mcp_servers.rag_server",
+}
+
+__all__ = list(_SERVER_MODULES)
+
+
+def __getattr__(name: str):
+    if name in _SERVER_MODULES:
+        return getattr(importlib.import_module(_SERVER_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,7 +10,9 @@ Provides shared functionality for all MCP servers including:
 import os
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from functools import cached_property
+from operator import itemgetter
+from typing import Any, Dict, FrozenSet, List, Optional
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger("mcp_servers")
@@ -61,6 +63,15 @@ class BaseMCPServer(ABC):
         """
         pass
     
+    @cached_property
+    def tool_name_set(self) -> FrozenSet[str]:
+        """Names of the tools this server exposes (tool definitions are static, so built once)."""
+        return frozenset(map(itemgetter("name"), self.get_tools()))
+    
+    def _has_tool(self, tool_name: str) -> bool:
+        """Check whether this server exposes a tool (lets call_tool reject unknown names up front)."""
+        return tool_name in self.tool_name_set
+    
     @abstractmethod
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """
@@ -121,6 +121,8 @@ class BlobMCPServer(BaseMCPServer):
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute a tool and return the result."""
+        if not self._has_tool(tool_name):
+            return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
         try:
             if tool_name == "list_customer_documents":
                 return await self._list_customer_documents(
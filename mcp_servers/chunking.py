@@ -0,0 +1,80 @@
+"""
+Token-based Text Chunking
+
+Splits document text into chunks measured in embedding-model tokens, so
+chunk sizes match the embedding model's real input budget.
+"""
+
+from functools import lru_cache
+from itertools import accumulate
+from typing import List
+
+import tiktoken
+
+# Tokenizer used by text-embedding-ada-002 and the text-embedding-3 models
+EMBEDDING_ENCODING = "cl100k_base"
+
+DEFAULT_CHUNK_TOKENS = 1000
+DEFAULT_OVERLAP_TOKENS = 100
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding:
+    """Get the shared tokenizer (loaded once per process)."""
+    return tiktoken.get_encoding(EMBEDDING_ENCODING)
+
+
+def chunk_by_tokens(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap: int = DEFAULT_OVERLAP_TOKENS
+) -> List[str]:
+    """
+    Split text into chunks of at most chunk_size tokens.
+    
+    Args:
+        text: Text to split
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Tokens shared between consecutive chunks
+        
+    Returns:
+        List of chunk strings (empty if text has no tokens)
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    
+    encoding = get_encoding()
+    token_bytes = encoding.decode_tokens_bytes(encoding.encode(text))
+    data = b"".join(token_bytes)
+    # Byte offset where each token starts, plus the end of the text
+    offsets = list(accumulate(map(len, token_bytes), initial=0))
+    token_count = len(token_bytes)
+    
+    def starts_character(i: int) -> bool:
+        """Whether a cut before token i lands on a UTF-8 character boundary."""
+        return i == token_count or data[offsets[i]] & 0xC0 != 0x80
+    
+    def cut_point(target: int, lower: int) -> int:
+        """
+        Nearest character boundary at or before target (and after lower).
+        
+        Non-ASCII characters often span several tokens; cutting between them
+        would decode to U+FFFD, so cuts move back to the start of the character.
+        Only moves forward if one character is longer than the whole window.
+        """
+        cut = target
+        while cut > lower + 1 and not starts_character(cut):
+            cut -= 1
+        while not starts_character(cut):
+            cut += 1
+        return cut
+    
+    chunks = []
+    start = 0
+    while start < token_count:
+        end = cut_point(min(start + chunk_size, token_count), start)
+        chunks.append(data[offsets[start]:offsets[end]].decode("utf-8"))
+        if end == token_count:
+            break
+        start = cut_point(max(end - chunk_overlap, start + 1), start)
+    return chunks
@@ -9,16 +9,68 @@ import os
 import logging
 import tempfile
 import asyncpg
+from pgvector.asyncpg import register_vector
 from typing import Optional, Tuple, List
 from pathlib import Path
 from datetime import datetime
 import json
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import AzureOpenAIEmbeddings
 from docling.document_converter import DocumentConverter
 
+from mcp_servers.chunking import chunk_by_tokens, DEFAULT_CHUNK_TOKENS, DEFAULT_OVERLAP_TOKENS
+
 logger = logging.getLogger("mcp_servers.document_processor")
 
+# Loading a large document into a (near-)empty table is much faster with the vector
+# indexes dropped and rebuilt once afterwards than maintained row by row. Only done
+# when the table holds at most a tenth as many rows as the load, so one upload never
+# triggers a rebuild over a large existing corpus.
+BULK_REINDEX_THRESHOLD = 5000
+BULK_REINDEX_MAX_EXISTING_RATIO = 0.1
+
+# Every ANN index on the table (ivfflat, halfvec HNSW and the partial HNSW indexes)
+SQL_VECTOR_INDEXES = """
+    SELECT indexname, indexdef FROM pg_indexes
+    WHERE schemaname = current_schema() AND tablename = 'policy_documents'
+      AND (indexdef LIKE '% USING ivfflat %' OR indexdef LIKE '% USING hnsw %')
+"""
+
+
+async def should_rebuild_indexes(conn: asyncpg.Connection, chunk_count: int) -> bool:
+    """Check whether a load is large enough, relative to the table, to drop and rebuild the vector indexes."""
+    if chunk_count <= BULK_REINDEX_THRESHOLD:
+        return False
+    existing_rows = await conn.fetchval("SELECT COUNT(*) FROM policy_documents")
+    return existing_rows <= chunk_count * BULK_REINDEX_MAX_EXISTING_RATIO
+
+
+async def drop_vector_indexes(conn: asyncpg.Connection) -> List[Tuple[str, str]]:
+    """
+    Drop every vector index on policy_documents and return (name, definition) pairs to rebuild.
+    
+    DROP INDEX CONCURRENTLY runs outside a transaction and does not block searches,
+    which fall back to a sequential scan of the (near-empty) table until the rebuild.
+    """
+    indexes = [(row["indexname"], row["indexdef"]) for row in await conn.fetch(SQL_VECTOR_INDEXES)]
+    for name, _ in indexes:
+        await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    return indexes
+
+
+async def rebuild_vector_indexes(conn: asyncpg.Connection, indexes: List[Tuple[str, str]]) -> None:
+    """Recreate dropped vector indexes with CREATE INDEX CONCURRENTLY, so searches keep running during the build."""
+    # Session-level settings: CONCURRENTLY cannot run inside a transaction block
+    await conn.execute("SET maintenance_work_mem = '2GB'")
+    await conn.execute("SET max_parallel_maintenance_workers = 4")
+    try:
+        for name, definition in indexes:
+            # IF NOT EXISTS: a concurrent bulk load may already have rebuilt it
+            await conn.execute(definition.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ", 1))
+            logger.info(f"Rebuilt {name} after bulk load")
+    finally:
+        await conn.execute("RESET maintenance_work_mem")
+        await conn.execute("RESET max_parallel_maintenance_workers")
+
 
 def convert_to_markdown(file_bytes: bytes, filename: str) -> str:
     """
@@ -71,8 +123,8 @@ async def process_document(
     file_bytes: bytes,
     filename: str,
     category: str = "general",
-    chunk_size: int = 1000,
-    chunk_overlap: int = 200
+    chunk_size: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap: int = DEFAULT_OVERLAP_TOKENS
 ) -> Tuple[int, str]:
     """
     Full document processing pipeline:
@@ -87,8 +139,8 @@ async def process_document(
         file_bytes: Raw document bytes
         filename: Original filename
         category: Document category for filtering
-        chunk_size: Maximum characters per chunk
-        chunk_overlap: Overlap between chunks
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Tokens shared between consecutive chunks
         
     Returns:
         Tuple of (chunk_count, status)
@@ -121,30 +173,44 @@ async def process_document(
         
         # Step 2: Chunk the text
         logger.info(f"Chunking {filename} with size={chunk_size}, overlap={chunk_overlap}...")
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
-        chunks = splitter.split_text(markdown_content)
+        chunks = chunk_by_tokens(markdown_content, chunk_size, chunk_overlap)
         
         if not chunks:
             raise ValueError("Text splitting produced no chunks")
         
         logger.info(f"Created {len(chunks)} chunks from {filename}")
         
-        # Step 3: Generate embeddings
-        logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-        chunk_embeddings = await embeddings.aembed_documents(chunks)
+        # Step 3: Generate embeddings (repeated boilerplate chunks are only embedded once)
+        unique_chunks = list(dict.fromkeys(chunks))
+        logger.info(f"Generating embeddings for {len(unique_chunks)} unique chunks...")
+        unique_embeddings = await embeddings.aembed_documents(unique_chunks)
+        embedding_by_chunk = dict(zip(unique_chunks, unique_embeddings))
+        chunk_embeddings = [embedding_by_chunk[chunk] for chunk in chunks]
         
         # Step 4: Store in database
         logger.info(f"Storing {len(chunks)} chunks in database...")
         async with pool.acquire() as conn:
-            for i, (chunk, embedding) in enumerate(zip(chunks, chunk_embeddings)):
-                await conn.execute("""
-                    INSERT INTO policy_documents (filename, category, content, chunk_index, embedding)
-                    VALUES ($1, $2, $3, $4, $5::vector)
-                """, filename, category, chunk, i, str(embedding))
+            dropped_indexes = []
+            if await should_rebuild_indexes(conn, len(chunks)):
+                logger.info(f"Dropping vector indexes for bulk load of {len(chunks)} chunks")
+                dropped_indexes = await drop_vector_indexes(conn)
+            
+            try:
+                async with conn.transaction():
+                    # Binary COPY needs the pgvector codec on this connection
+                    await register_vector(conn)
+                    await conn.copy_records_to_table(
+                        "policy_documents",
+                        records=[
+                            (filename, category, chunk, i, embedding)
+                            for i, (chunk, embedding) in enumerate(zip(chunks, chunk_embeddings))
+                        ],
+                        columns=["filename", "category", "content", "chunk_index", "embedding"],
+                    )
+            finally:
+                # Restore the indexes even if the load failed
+                if dropped_indexes:
+                    await rebuild_vector_indexes(conn, dropped_indexes)
         
         logger.info(f"Successfully processed {filename}: {len(chunks)} chunks indexed")
         return len(chunks), "indexed"
@@ -268,16 +334,9 @@ async def get_document_chunks(pool: asyncpg.Pool, filename: str) -> List[dict]:
 async def get_document_details_by_id(pool: asyncpg.Pool, document_id: int) -> Optional[dict]:
     """
     Get document details using a representative chunk row ID.
-    Resolves the filename, then aggregates details.
+    Resolves the filename in a subquery so details are fetched in one round-trip.
     """
     async with pool.acquire() as conn:
-        filename = await conn.fetchval(
-            "SELECT filename FROM policy_documents WHERE id = $1",
-            document_id,
-        )
-        if not filename:
-            return None
-
         row = await conn.fetchrow(
             """
             SELECT 
@@ -287,10 +346,10 @@ async def get_document_details_by_id(pool: asyncpg.Pool, document_id: int) -> Op
                 MIN(uploaded_at) as uploaded_at,
                 SUM(LENGTH(content)) as total_chars
             FROM policy_documents
-            WHERE filename = $1
+            WHERE filename = (SELECT filename FROM policy_documents WHERE id = $1)
             GROUP BY filename, category
             """,
-            filename,
+            document_id,
         )
 
         if not row:
@@ -304,7 +363,7 @@ async def get_document_details_by_id(pool: asyncpg.Pool, document_id: int) -> Op
             ORDER BY chunk_index
             LIMIT 5
             """,
-            filename,
+            row["filename"],
         )
 
         return {
@@ -325,16 +384,9 @@ async def get_document_details_by_id(pool: asyncpg.Pool, document_id: int) -> Op
 async def get_document_chunks_by_id(pool: asyncpg.Pool, document_id: int) -> List[dict]:
     """
     Get all chunks for a document by a representative chunk row ID.
-    Resolves the filename first, then selects by filename.
+    Resolves the filename in a subquery so chunks are fetched in one round-trip.
     """
     async with pool.acquire() as conn:
-        filename = await conn.fetchval(
-            "SELECT filename FROM policy_documents WHERE id = $1",
-            document_id,
-        )
-        if not filename:
-            return []
-
         rows = await conn.fetch(
             """
             SELECT 
@@ -344,10 +396,10 @@ async def get_document_chunks_by_id(pool: asyncpg.Pool, document_id: int) -> Lis
                 uploaded_at,
                 LENGTH(content) as char_count
             FROM policy_documents
-            WHERE filename = $1
+            WHERE filename = (SELECT filename FROM policy_documents WHERE id = $1)
             ORDER BY chunk_index
             """,
-            filename,
+            document_id,
         )
 
         return [
@@ -100,6 +100,8 @@ class EmailMCPServer(BaseMCPServer):
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute a tool and return the result."""
+        if not self._has_tool(tool_name):
+            return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
         try:
             if tool_name == "send_kyc_approved_email":
                 return await self._send_kyc_approved_email(arguments)
@@ -144,6 +144,8 @@ class PostgresMCPServer(BaseMCPServer):
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute a tool and return the result."""
+        if not self._has_tool(tool_name):
+            return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
         try:
             if tool_name == "get_customer_by_email":
                 return await self._get_customer_by_email(arguments["email"])
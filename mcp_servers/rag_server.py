@@ -15,11 +15,19 @@ import logging
 from typing import Any, Dict, List, Optional
 
 import asyncpg
+import httpx
+from pgvector.asyncpg import register_vector
 from langchain_openai import AzureOpenAIEmbeddings
 
 from mcp_servers.base import BaseMCPServer, ToolResult, get_env_or_default
+from mcp_servers.chunking import chunk_by_tokens, DEFAULT_CHUNK_TOKENS, DEFAULT_OVERLAP_TOKENS
 from mcp_servers.http_app import create_mcp_http_app
 
+# Search the FP16 copy of the embeddings (see datamodel/migration_add_halfvec_embedding.sql).
+# The FP32 column is kept so both can be compared before switching over for good.
+USE_HALFVEC = os.environ.get("RAG_USE_HALFVEC", "false").lower() == "true"
+EMBEDDING_COLUMN, EMBEDDING_TYPE = ("embedding_half", "halfvec") if USE_HALFVEC else ("embedding", "vector")
+
 logger = logging.getLogger("mcp_servers.rag")
 
 
@@ -34,6 +42,7 @@ class RAGMCPServer(BaseMCPServer):
         super().__init__()
         self._pool = pool
         self._embeddings: Optional[AzureOpenAIEmbeddings] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
     
     @property
     def name(self) -> str:
@@ -48,19 +57,30 @@ class RAGMCPServer(BaseMCPServer):
                 database=get_env_or_default("POSTGRES_DB", "kyc_crm"),
                 user=get_env_or_default("POSTGRES_USER", "postgres"),
                 password=os.environ.get("POSTGRES_PASSWORD", ""),
-                min_size=2,
-                max_size=10,
+                min_size=4,
+                max_size=32,
+                max_inactive_connection_lifetime=300,
+                statement_cache_size=256,
+                command_timeout=60,
+                init=register_vector,
             )
         return self._pool
     
     def _get_embeddings(self) -> AzureOpenAIEmbeddings:
         """Get or create embeddings model."""
         if self._embeddings is None:
+            # One pooled HTTP/2 client keeps the Azure OpenAI connection alive between batches
+            self._http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(60.0),
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+            )
             self._embeddings = AzureOpenAIEmbeddings(
                 azure_deployment=get_env_or_default("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002"),
                 azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT", ""),
                 api_key=os.environ.get("AZURE_OPENAI_API_KEY", ""),
                 api_version=get_env_or_default("AZURE_OPENAI_API_VERSION", "2024-10-21"),
+                http_async_client=self._http_client,
             )
         return self._embeddings
     
@@ -128,6 +148,8 @@ class RAGMCPServer(BaseMCPServer):
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute a tool and return the result."""
+        if not self._has_tool(tool_name):
+            return ToolResult(success=False, error=f"Unknown tool: {tool_name}")
         try:
             if tool_name == "search_policies":
                 return await self._search_policies(
@@ -168,26 +190,27 @@ class RAGMCPServer(BaseMCPServer):
         query_embedding = await embeddings.aembed_query(query)
         
         async with pool.acquire() as conn:
-            # Build query with optional category filter
+            # Build query with optional category filter. Embeddings are unit length, so
+            # negative inner product (<#>) ranks like cosine distance and -<#> is the cosine similarity
             if category:
-                rows = await conn.fetch("""
+                rows = await conn.fetch(f"""
                     SELECT 
                         id, filename, category, content, chunk_index,
-                        1 - (embedding <=> $1::vector) as similarity
+                        ({EMBEDDING_COLUMN} <#> $1::{EMBEDDING_TYPE}) * -1 as similarity
                     FROM policy_documents
                     WHERE category = $2
-                    ORDER BY embedding <=> $1::vector
+                    ORDER BY {EMBEDDING_COLUMN} <#> $1::{EMBEDDING_TYPE}
                     LIMIT $3
-                """, str(query_embedding), category, limit)
+                """, query_embedding, category, limit)
             else:
-                rows = await conn.fetch("""
+                rows = await conn.fetch(f"""
                     SELECT 
                         id, filename, category, content, chunk_index,
-                        1 - (embedding <=> $1::vector) as similarity
+                        ({EMBEDDING_COLUMN} <#> $1::{EMBEDDING_TYPE}) * -1 as similarity
                     FROM policy_documents
-                    ORDER BY embedding <=> $1::vector
+                    ORDER BY {EMBEDDING_COLUMN} <#> $1::{EMBEDDING_TYPE}
                     LIMIT $2
-                """, str(query_embedding), limit)
+                """, query_embedding, limit)
             
             results = [
                 {
@@ -311,9 +334,8 @@ class RAGMCPServer(BaseMCPServer):
         pool = await self._get_pool()
         async with pool.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT DISTINCT category, COUNT(*) as doc_count
-                FROM policy_documents
-                GROUP BY category
+                SELECT category, document_count as doc_count
+                FROM policy_category_counts
                 ORDER BY category
             """)
             
@@ -353,9 +375,12 @@ class RAGMCPServer(BaseMCPServer):
             })
     
     async def close(self):
-        """Close the connection pool."""
+        """Close the connection pool and the Azure OpenAI HTTP client."""
         if self._pool:
             await self._pool.close()
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
 
 
 # FastAPI app exposing HTTP MCP endpoints (defined after class)
@@ -369,8 +394,8 @@ async def ingest_policy_document(
     filename: str,
     content: str,
     category: str,
-    chunk_size: int = 1000,
-    chunk_overlap: int = 200
+    chunk_size: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap: int = DEFAULT_OVERLAP_TOKENS
 ) -> int:
     """
     Ingest a policy document by chunking, embedding, and storing.
@@ -381,32 +406,30 @@ async def ingest_policy_document(
         filename: Original filename
         content: Document text content
         category: Policy category
-        chunk_size: Max characters per chunk
-        chunk_overlap: Overlap between chunks
+        chunk_size: Max tokens per chunk
+        chunk_overlap: Tokens shared between consecutive chunks
         
     Returns:
         Number of chunks created
     """
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    
     # Split into chunks
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    chunks = splitter.split_text(content)
+    chunks = chunk_by_tokens(content, chunk_size, chunk_overlap)
     
     # Generate embeddings for all chunks
     chunk_embeddings = await embeddings.aembed_documents(chunks)
     
     # Store in database
+    # Binary COPY loads all chunks in one round trip instead of one INSERT per chunk
     async with pool.acquire() as conn:
-        for i, (chunk, embedding) in enumerate(zip(chunks, chunk_embeddings)):
-            await conn.execute("""
-                INSERT INTO policy_documents (filename, category, content, chunk_index, embedding)
-                VALUES ($1, $2, $3, $4, $5::vector)
-            """, filename, category, chunk, i, str(embedding))
+        await register_vector(conn)
+        await conn.copy_records_to_table(
+            "policy_documents",
+            records=[
+                (filename, category, chunk, i, embedding)
+                for i, (chunk, embedding) in enumerate(zip(chunks, chunk_embeddings))
+            ],
+            columns=["filename", "category", "content", "chunk_index", "embedding"],
+        )
     
     logger.info(f"Ingested {len(chunks)} chunks from {filename}")
     return len(chunks)
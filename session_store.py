@@ -0,0 +1,254 @@
+"""
+Session Storage for the KYC API
+
+Sessions are accessed through a SessionStore so the API can run with more
+than one worker process:
+
+- FileSessionStore (default): sessions are kept in memory and a background
+  task flushes changed sessions to one JSON file per session. State is local
+  to the process, so only use it with a single worker.
+- RedisSessionStore (when REDIS_URL is set): sessions live in a Redis hash
+  keyed by session id, so every worker sees the same state.
+"""
+import os
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import quote
+
+import orjson
+
+from error_handling import ServiceUnavailableError, trace_function
+
+logger = logging.getLogger("kyc.session_store")
+
+# One file per session, so a chat turn only rewrites the session it touched
+SESSIONS_DIR = Path("sessions")
+
+# Writes within this window are coalesced into a single save
+SESSION_FLUSH_INTERVAL_SECONDS = 0.2
+
+# Sessions with longer histories are serialized in a worker thread
+LARGE_SESSION_MESSAGES = 100
+
+
+def encode_session(session: Dict[str, Any]) -> bytes:
+    """Serialize a session to JSON bytes."""
+    return orjson.dumps(session, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def session_path(directory: Path, session_id: str) -> Path:
+    """Get the file for a session (the id is quoted so it can never escape the directory)."""
+    return directory / f"{quote(session_id, safe='')}.json"
+
+
+@trace_function()
+def load_sessions(directory: Path) -> Dict[str, Any]:
+    """Load all sessions from a sessions directory."""
+    try:
+        loaded = {}
+        if directory.exists():
+            for path in directory.glob("*.json"):
+                session = orjson.loads(path.read_bytes())
+                loaded[session["id"]] = session
+        return loaded
+    except Exception:
+        logger.error("Failed to load sessions", exc_info=True)
+        return {}
+
+
+@trace_function()
+def save_sessions(
+    directory: Path,
+    sessions: Dict[str, Any],
+    session_ids: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Save sessions to their files; ids no longer in sessions have their file removed.
+
+    Each file is written to a temp file and renamed so a crash never leaves it half-written.
+    Saves every session when session_ids is not given.
+    """
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        for session_id in (sessions.keys() if session_ids is None else session_ids):
+            path = session_path(directory, session_id)
+            session = sessions.get(session_id)
+            if session is None:
+                path.unlink(missing_ok=True)
+                continue
+            # Unique temp name, so concurrent saves of one session never share a temp file
+            tmp_file = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_file.write_bytes(encode_session(session))
+            os.replace(tmp_file, path)
+    except Exception as e:
+        logger.error("Failed to save sessions", exc_info=True)
+        raise ServiceUnavailableError("Session Storage", cause=e)
+
+
+class SessionStore(ABC):
+    """Storage backend for chat sessions."""
+
+    async def start(self) -> None:
+        """Start any background work (called from the app lifespan)."""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def save(self, session: Dict[str, Any]) -> None:
+        """Create or replace a session (keyed by session["id"])."""
+        pass
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist."""
+        pass
+
+    @abstractmethod
+    async def list(self) -> List[Dict[str, Any]]:
+        """List all sessions."""
+        pass
+
+    async def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+
+class FileSessionStore(SessionStore):
+    """In-process sessions persisted to per-session JSON files (single worker only)."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = directory or SESSIONS_DIR
+        self._sessions = load_sessions(self.directory)
+        # Ids of sessions changed or deleted since the last save
+        self._dirty_ids: Set[str] = set()
+        self._dirty: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._dirty = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._sessions.get(session_id)
+
+    async def save(self, session: Dict[str, Any]) -> None:
+        self._sessions[session["id"]] = session
+        self._mark_dirty(session["id"])
+
+    async def delete(self, session_id: str) -> bool:
+        if self._sessions.pop(session_id, None) is None:
+            return False
+        self._mark_dirty(session_id)
+        return True
+
+    async def list(self) -> List[Dict[str, Any]]:
+        return list(self._sessions.values())
+
+    def _mark_dirty(self, session_id: str) -> None:
+        """Schedule a session to be saved by the background flusher."""
+        if self._dirty is None:
+            # No flusher running (store used without start()) - save immediately
+            save_sessions(self.directory, self._sessions, [session_id])
+        else:
+            self._dirty_ids.add(session_id)
+            self._dirty.set()
+
+    def _take_dirty_ids(self) -> List[str]:
+        """Return and reset the ids of sessions with unsaved changes."""
+        session_ids = list(self._dirty_ids)
+        self._dirty_ids.clear()
+        return session_ids
+
+    async def _flush_periodically(self) -> None:
+        """Save changed sessions whenever they are marked dirty, batching changes that arrive close together."""
+        while True:
+            await self._dirty.wait()
+            if not self._stopping:
+                await asyncio.sleep(SESSION_FLUSH_INTERVAL_SECONDS)
+            self._dirty.clear()
+            try:
+                # Serialization and file writes both run in a worker thread, off the event loop.
+                # orjson holds the GIL while serializing, so each session snapshot is consistent.
+                await asyncio.to_thread(save_sessions, self.directory, self._sessions, self._take_dirty_ids())
+            except ServiceUnavailableError:
+                # Already logged by save_sessions; retry on the next change
+                pass
+            if self._stopping:
+                return
+
+    async def close(self) -> None:
+        # Let the flusher finish its current save (cancelling it would leave the worker
+        # thread running, and its older snapshot could land after the final save below),
+        # then write out anything changed since.
+        if self._flusher:
+            self._stopping = True
+            self._dirty.set()
+            await self._flusher
+            self._flusher = None
+        self._dirty = None
+        if self._dirty_ids:
+            try:
+                save_sessions(self.directory, self._sessions, self._take_dirty_ids())
+            except ServiceUnavailableError:
+                pass  # Already logged by save_sessions
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions stored in a Redis hash, shared by all worker processes."""
+
+    def __init__(self, url: str, key: str = "kyc:sessions"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._key = key
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = await self._redis.hget(self._key, session_id)
+        except Exception as e:
+            raise ServiceUnavailableError("Session Storage", cause=e)
+        return orjson.loads(data) if data is not None else None
+
+    async def save(self, session: Dict[str, Any]) -> None:
+        # Keep long histories from stalling the event loop while they are serialized
+        if len(session.get("messages", ())) > LARGE_SESSION_MESSAGES:
+            data = await asyncio.to_thread(encode_session, session)
+        else:
+            data = encode_session(session)
+        try:
+            await self._redis.hset(self._key, session["id"], data)
+        except Exception as e:
+            raise ServiceUnavailableError("Session Storage", cause=e)
+
+    async def delete(self, session_id: str) -> bool:
+        try:
+            return await self._redis.hdel(self._key, session_id) > 0
+        except Exception as e:
+            raise ServiceUnavailableError("Session Storage", cause=e)
+
+    async def list(self) -> List[Dict[str, Any]]:
+        try:
+            values = await self._redis.hvals(self._key)
+        except Exception as e:
+            raise ServiceUnavailableError("Session Storage", cause=e)
+        return [orjson.loads(value) for value in values]
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store: Redis when REDIS_URL is set, otherwise files."""
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        logger.info("Using Redis session store")
+        return RedisSessionStore(redis_url)
+    logger.info("Using file session store (single worker only)")
+    return FileSessionStore()
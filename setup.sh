@@ -19,14 +19,23 @@ echo "✅ Prerequisites check passed"
 
 # Setup backend
 echo "📦 Setting up backend..."
-echo "Creating Python virtual environment..."
-python3 -m venv venv
+if [ ! -d venv ]; then
+    echo "Creating Python virtual environment..."
+    python3 -m venv venv
+fi
 
 echo "Activating virtual environment..."
 source venv/bin/activate
 
-echo "Installing Python dependencies..."
-pip install -r requirements.txt
+# Only reinstall when requirements.txt has changed since the last install
+REQUIREMENTS_HASH=$(python3 -c "import hashlib; print(hashlib.sha256(open('requirements.txt', 'rb').read()).hexdigest())")
+REQUIREMENTS_STAMP=venv/.requirements.sha256
+if [ -f "$REQUIREMENTS_STAMP" ] && [ "$(cat "$REQUIREMENTS_STAMP")" = "$REQUIREMENTS_HASH" ]; then
+    echo "Python dependencies are up to date"
+else
+    echo "Installing Python dependencies..."
+    pip install --disable-pip-version-check --no-input -r requirements.txt && echo "$REQUIREMENTS_HASH" > "$REQUIREMENTS_STAMP"
+fi
 
 # Setup frontend
 echo "📦 Setting up frontend..."
@@ -5,18 +5,16 @@ Executes all MCP component connection tests and provides a summary.
 import subprocess
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def run_test(test_name: str, script_path: str) -> bool:
-    """Run a single test script and return success status."""
-    print(f"\n{'=' * 70}")
-    print(f"  Running: {test_name}")
-    print(f"{'=' * 70}\n")
-    
-    result = subprocess.run(
+def run_test(script_path: str) -> subprocess.CompletedProcess:
+    """Run a single test script, capturing its output."""
+    return subprocess.run(
         [sys.executable, script_path],
-        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True
     )
-    return result.returncode == 0
 
 def main():
     print("\n" + "🔧" * 35)
@@ -33,10 +31,19 @@ def main():
         ("SendGrid Email", os.path.join(tests_dir, "test_sendgrid_connection.py")),
     ]
     
-    results = {}
+    # The scripts are independent and mostly wait on the network, so run them together
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        processes = list(executor.map(run_test, [script_path for _, script_path in tests]))
     
-    for test_name, script_path in tests:
-        results[test_name] = run_test(test_name, script_path)
+    # Print each script's output in order once all have finished
+    results = {}
+    for (test_name, _), process in zip(tests, processes):
+        print(f"\n{'=' * 70}")
+        print(f"  Running: {test_name}")
+        print(f"{'=' * 70}\n")
+        print(process.stdout, end="")
+        print(process.stderr, end="", file=sys.stderr)
+        results[test_name] = process.returncode == 0
     
     # Print summary
     print("\n" + "=" * 70)
@@ -5,13 +5,24 @@ Tests agents using HTTP MCP architecture with langchain-mcp-adapters.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 import json
 
 from agents.base_http import BaseKYCAgentHTTP
 from mcp_client import KYCMCPClient
 
 
+# Canned LLM response, serialized once for the module
+PASS_RESPONSE = json.dumps({
+    "stage": "intake",
+    "decision": "PASS",
+    "reason": "All information collected",
+    "user_message": "Thank you!",
+    "checks": []
+})
+
+
 class MockIntakeAgentHTTP(BaseKYCAgentHTTP):
     """Mock Intake Agent for testing."""
     
@@ -28,6 +39,13 @@ class MockIntakeAgentHTTP(BaseKYCAgentHTTP):
         return ["postgres__get_customer_by_email"]
 
 
+@pytest.fixture(scope="module")
+def intake_agent():
+    """Intake agent with a mocked LLM, built once for the tool-listing tests."""
+    with patch.object(MockIntakeAgentHTTP, '_create_default_llm', return_value=MagicMock()):
+        return MockIntakeAgentHTTP()
+
+
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestBaseAgentHTTP:
     """Tests for BaseKYCAgentHTTP functionality with HTTP MCP."""
@@ -83,90 +101,57 @@ class TestBaseAgentHTTP:
         # Should return default REVIEW decision
         assert parsed["decision"] == "REVIEW"
     
-    @pytest.mark.asyncio
-    async def test_get_tools_from_mcp_client(self, mcp_client):
+    async def test_get_tools_from_mcp_client(self, mcp_client, intake_agent):
         """Test getting tools from HTTP MCP client."""
-        with patch.object(MockIntakeAgentHTTP, '_create_default_llm', return_value=MagicMock()):
-            agent = MockIntakeAgentHTTP()
+        # Mock the mcp_client
+        with patch('agents.base_http.get_mcp_client', return_value=mcp_client):
+            tools = await intake_agent.get_tools()
             
-            # Mock the mcp_client
-            with patch('agents.base_http.get_mcp_client', return_value=mcp_client):
-                tools = await agent.get_tools()
-                
-                # Should get some tools
-                assert isinstance(tools, list)
-                assert len(tools) > 0
+            # Should get some tools
+            assert isinstance(tools, list)
+            assert len(tools) > 0
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestHTTPMCPIntegration:
     """Tests for HTTP MCP integration with agents."""
     
-    @pytest.mark.asyncio
-    async def test_agent_can_list_tools(self, mcp_client):
+    async def test_agent_can_list_tools(self, mcp_client, intake_agent):
         """Test that agent can list available HTTP MCP tools."""
-        with patch.object(MockIntakeAgentHTTP, '_create_default_llm', return_value=MagicMock()):
-            agent = MockIntakeAgentHTTP()
-            
-            with patch('agents.base_http.get_mcp_client', return_value=mcp_client):
-                tools = await agent.get_tools()
-                assert isinstance(tools, list)
+        with patch('agents.base_http.get_mcp_client', return_value=mcp_client):
+            tools = await intake_agent.get_tools()
+            assert isinstance(tools, list)
     
-    @pytest.mark.asyncio
     async def test_mcp_client_has_all_servers(self, mcp_client):
         """Test that MCP client has tools from all servers."""
         all_tools = await mcp_client.get_tools()
-        tool_names = [tool.name for tool in all_tools]
+        # Server prefixes seen across all tool names, collected in one pass
+        prefixes = {tool.name.split("__", 1)[0] for tool in all_tools if "__" in tool.name}
         
         # Should have tools from all 4 servers
-        has_postgres = any("postgres__" in name for name in tool_names)
-        has_blob = any("blob__" in name for name in tool_names)
-        has_email = any("email__" in name for name in tool_names)
-        has_rag = any("rag__" in name for name in tool_names)
-        
-        assert has_postgres, "Missing postgres tools"
-        assert has_blob, "Missing blob tools"
-        assert has_email, "Missing email tools"
-        assert has_rag, "Missing RAG tools"
+        missing = {"postgres", "blob", "email", "rag"} - prefixes
+        assert not missing, f"Missing tools for servers: {sorted(missing)}"
     
-    @pytest.mark.asyncio
-    async def test_agent_tool_filtering(self, mcp_client):
+    async def test_agent_tool_filtering(self, mcp_client, intake_agent):
         """Test that agent only gets tools it needs."""
-        with patch.object(MockIntakeAgentHTTP, '_create_default_llm', return_value=MagicMock()):
-            agent = MockIntakeAgentHTTP()
+        with patch('agents.base_http.get_mcp_client', return_value=mcp_client):
+            agent_tools = await intake_agent.get_tools()
+            agent_tool_names = frozenset(tool.name for tool in agent_tools)
             
-            with patch('agents.base_http.get_mcp_client', return_value=mcp_client):
-                agent_tools = await agent.get_tools()
-                agent_tool_names = [tool.name for tool in agent_tools]
-                
-                # Ensure agent retrieved some tools
-                assert isinstance(agent_tools, list)
-                assert len(agent_tools) > 0
+            # Ensure agent retrieved some tools
+            assert isinstance(agent_tools, list)
+            assert len(agent_tools) > 0
+            assert "postgres__get_customer_by_email" in agent_tool_names
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestAgentInvocation:
     """Tests for agent invocation with HTTP MCP tools."""
     
-    @pytest.mark.asyncio
-    async def test_agent_invoke_with_http_tools(self, mcp_client):
+    async def test_agent_invoke_with_http_tools(self, mcp_client, make_mock_llm):
         """Test agent invocation with HTTP MCP tools bound to LLM."""
         # Mock LLM that returns a structured response
-        mock_llm = MagicMock()
-        mock_response = MagicMock()
-        mock_response.content = json.dumps({
-            "stage": "intake",
-            "decision": "PASS",
-            "reason": "All information collected",
-            "user_message": "Thank you!",
-            "checks": []
-        })
-        
-        # Mock the LLM to return the response
-        # bind_tools should return another mock with async methods
-        mock_llm_with_tools = MagicMock()
-        mock_llm_with_tools.ainvoke = AsyncMock(return_value=mock_response)
-        mock_llm.bind_tools = MagicMock(return_value=mock_llm_with_tools)
+        mock_llm = make_mock_llm(PASS_RESPONSE)
         
         with patch.object(MockIntakeAgentHTTP, '_create_default_llm', return_value=mock_llm):
             agent = MockIntakeAgentHTTP()
@@ -193,11 +178,54 @@ class TestAgentInvocation:
                 assert "parsed_decision" in result
 
 
+class TestAgentToolLoop:
+    """Tests for the agent's tool-calling loop (no MCP servers needed)."""
+    
+    async def test_tool_calls_resolved_against_agent_tools(self):
+        """Test that a turn's tool calls run on the agent's own tools, with unknown and failing tools answered as errors."""
+        lookup = SimpleNamespace(name="postgres__get_customer_by_email", ainvoke=AsyncMock(return_value={"found": True}))
+        failing = SimpleNamespace(name="postgres__save_kyc_session_state", ainvoke=AsyncMock(side_effect=ValueError("bad args")))
+        tool_calls = [
+            {"name": lookup.name, "args": {"email": "john@example.com"}, "id": "call-1"},
+            {"name": "email__send_kyc_approved_email", "args": {}, "id": "call-2"},
+            {"name": failing.name, "args": {}, "id": "call-3"},
+        ]
+        llm_with_tools = MagicMock()
+        llm_with_tools.ainvoke = AsyncMock(side_effect=[
+            SimpleNamespace(content="", tool_calls=tool_calls),
+            SimpleNamespace(content=PASS_RESPONSE),
+        ])
+        llm = MagicMock()
+        llm.bind_tools = MagicMock(return_value=llm_with_tools)
+        
+        with patch.object(MockIntakeAgentHTTP, '_create_default_llm', return_value=llm):
+            agent = MockIntakeAgentHTTP()
+        mcp_client = MagicMock()
+        
+        with patch.object(agent, 'get_tools', AsyncMock(return_value=[lookup, failing])), \
+                patch('agents.base_http.get_mcp_client', return_value=mcp_client):
+            result = await agent.invoke({"messages": ["Hi"], "customer_data": {}})
+        
+        assert result["parsed_decision"]["decision"] == "PASS"
+        lookup.ainvoke.assert_awaited_once_with({"email": "john@example.com"})
+        failing.ainvoke.assert_awaited_once_with({})
+        # Tool calls never go through the shared MCP client (or its circuit breaker)
+        mcp_client.call_tools_batch.assert_not_called()
+        mcp_client.call_tool.assert_not_called()
+        assert [call["tool_name"] for call in result["tool_calls"]] == [lookup.name]
+        
+        # Every tool call in the turn is answered, in order
+        tool_messages = llm_with_tools.ainvoke.call_args_list[1].args[0][-3:]
+        assert [m.tool_call_id for m in tool_messages] == ["call-1", "call-2", "call-3"]
+        assert tool_messages[0].content == '{"found": true}'
+        assert tool_messages[1].content == "Error: Tool not found: email__send_kyc_approved_email"
+        assert tool_messages[2].content == "Error: bad args"
+
+
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestMCPClientTools:
     """Test HTTP MCP client tool invocation."""
     
-    @pytest.mark.asyncio
     async def test_call_postgres_tool(self, mcp_client):
         """Test calling a PostgreSQL tool via HTTP MCP."""
         tools = await mcp_client.get_tools()
@@ -205,7 +233,6 @@ class TestMCPClientTools:
         assert isinstance(tools, list)
         assert len(tools) > 0
     
-    @pytest.mark.asyncio
     async def test_list_tools_by_server(self, mcp_client):
         """Test filtering tools by server."""
         # Verify client provides tools without strict prefix requirement
@@ -6,9 +6,6 @@ import os
 import sys
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 def test_azure_embeddings():
     print("=" * 60)
     print("Testing Azure OpenAI Embeddings Connection")
@@ -57,5 +54,7 @@ def test_azure_embeddings():
         return False
 
 if __name__ == "__main__":
+    # Under pytest, conftest.py loads .env once for the whole session
+    load_dotenv()
     success = test_azure_embeddings()
     sys.exit(0 if success else 1)
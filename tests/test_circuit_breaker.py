@@ -41,7 +41,6 @@ async def mcp_client():
     await client.close()
 
 
-@pytest.mark.asyncio
 async def test_circuit_breaker_normal_operation(mcp_client):
     """Test that circuit breaker allows normal operations."""
     # Get the tool
@@ -55,7 +54,6 @@ async def test_circuit_breaker_normal_operation(mcp_client):
     assert mcp_client._circuit_breaker.current_state == CircuitBreakerState.CLOSED
 
 
-@pytest.mark.asyncio
 async def test_circuit_breaker_opens_after_failures(mcp_client):
     """Test that circuit breaker opens after failure threshold."""
     # Get the tool and make it fail
@@ -75,7 +73,6 @@ async def test_circuit_breaker_opens_after_failures(mcp_client):
         await mcp_client.call_tool("postgres__test_tool", {"arg": "value"})
 
 
-@pytest.mark.asyncio
 async def test_circuit_breaker_half_open_recovery(mcp_client):
     """Test circuit breaker recovery after timeout."""
     # Get the tool
@@ -85,10 +82,10 @@ async def test_circuit_breaker_half_open_recovery(mcp_client):
     import asyncio
     from datetime import timedelta
     
-    # Create a new circuit breaker with 1 second timeout for testing
+    # Create a new circuit breaker with a 100ms timeout so the test waits as little as possible
     mcp_client._circuit_breaker = CircuitBreaker(
         fail_max=2,
-        timeout_duration=timedelta(seconds=1),
+        timeout_duration=timedelta(milliseconds=100),
         name="test_recovery"
     )
     
@@ -105,7 +102,7 @@ async def test_circuit_breaker_half_open_recovery(mcp_client):
         await mcp_client.call_tool("postgres__test_tool", {"arg": "value"})
     
     # Wait for timeout to transition to half-open
-    await asyncio.sleep(1.1)
+    await asyncio.sleep(0.15)
     
     # Fix the tool
     tool.ainvoke = AsyncMock(return_value={"result": "recovered"})
@@ -116,7 +113,6 @@ async def test_circuit_breaker_half_open_recovery(mcp_client):
     assert mcp_client._circuit_breaker.current_state == CircuitBreakerState.CLOSED
 
 
-@pytest.mark.asyncio
 async def test_circuit_breaker_per_client_instance(mcp_client):
     """Test that circuit breaker state is per client instance."""
     # Create another client
@@ -145,7 +141,6 @@ async def test_circuit_breaker_per_client_instance(mcp_client):
     await client2.close()
 
 
-@pytest.mark.asyncio
 async def test_circuit_breaker_with_tracing(mcp_client):
     """Test that circuit breaker works with tracing enabled."""
     from error_handling import get_tracer
@@ -167,3 +162,17 @@ async def test_circuit_breaker_with_tracing(mcp_client):
     # Circuit open - should raise RuntimeError
     with pytest.raises(RuntimeError, match="Service temporarily unavailable"):
         await mcp_client.call_tool("postgres__test_tool", {"arg": "value"})
+
+
+async def test_call_tools_batch_returns_results_in_order(mcp_client):
+    """Test that batched tool calls keep their order and return failures as exceptions."""
+    results = await mcp_client.call_tools_batch([
+        ("postgres__test_tool", {"arg": "a"}),
+        ("postgres__missing_tool", {}),
+        ("postgres__test_tool", {"arg": "b"}),
+    ])
+    
+    assert results[0] == {"result": "success"}
+    assert isinstance(results[1], ValueError)
+    assert results[2] == {"result": "success"}
+    assert mcp_client._tools[0].ainvoke.call_count == 2
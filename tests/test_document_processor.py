@@ -1,13 +1,10 @@
 
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from mcp_servers import document_processor
 from mcp_servers.document_processor import convert_to_markdown, process_document
+from mcp_servers.chunking import EMBEDDING_ENCODING, chunk_by_tokens, get_encoding
 
 # Mock docling to avoid external dependency issues during basic testing
 @pytest.fixture
@@ -37,10 +34,24 @@ def mock_pool():
     
     pool.acquire.return_value = cm
     
+    # conn.transaction() returns an async context manager, not a coroutine
+    tx = MagicMock()
+    tx.__aenter__ = AsyncMock(return_value=None)
+    tx.__aexit__ = AsyncMock(return_value=None)
+    conn.transaction = MagicMock(return_value=tx)
+    
     # Mock existing check to return 0 (no existing document)
     conn.fetchval.return_value = 0
     return pool
 
+@pytest.fixture(scope="module")
+def encoding():
+    """The embedding tokenizer; skips when it is not in TIKTOKEN_CACHE_DIR and cannot be downloaded"""
+    try:
+        return get_encoding()
+    except Exception as e:
+        pytest.skip(f"tiktoken encoding {EMBEDDING_ENCODING} unavailable: {e}")
+
 @pytest.fixture
 def mock_embeddings():
     embeddings = AsyncMock()
@@ -62,7 +73,30 @@ def test_convert_to_markdown_invalid_ext():
     with pytest.raises(ValueError, match="Unsupported file type"):
         convert_to_markdown(b"content", "test.txt")
 
-@pytest.mark.asyncio
+def test_chunk_by_tokens_respects_token_budget(encoding):
+    """Test that chunks never exceed the token budget and overlap as requested"""
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = chunk_by_tokens(text, chunk_size=100, chunk_overlap=10)
+    
+    assert len(chunks) > 1
+    assert all(len(encoding.encode(c)) <= 100 for c in chunks)
+    assert chunks[0].startswith("word0")
+
+def test_chunk_by_tokens_keeps_multibyte_characters_whole(encoding):
+    """Test that chunk cuts never split a character that spans several tokens"""
+    text = "Politique de conformité – 日本語のポリシー文書 🔒✅ " * 40
+    chunks = chunk_by_tokens(text, chunk_size=7, chunk_overlap=2)
+
+    assert len(chunks) > 1
+    assert "\ufffd" not in "".join(chunks)
+    assert all(chunk in text for chunk in chunks)
+
+def test_chunk_by_tokens_invalid_overlap():
+    """Test validation of overlap against chunk size"""
+    with pytest.raises(ValueError, match="chunk_overlap"):
+        chunk_by_tokens("content", chunk_size=10, chunk_overlap=10)
+
+@pytest.mark.usefixtures("encoding")
 async def test_process_document(mock_pool, mock_embeddings, mock_docling):
     """Test full document processing pipeline with mocks"""
     file_bytes = b"fake pdf content"
@@ -82,8 +116,30 @@ async def test_process_document(mock_pool, mock_embeddings, mock_docling):
     
     # Verify database interactions
     conn = mock_pool.acquire.return_value.__aenter__.return_value
-    assert conn.execute.called
-    # Check that INSERT was called
-    insert_calls = [c for c in conn.execute.call_args_list if "INSERT INTO policy_documents" in c[0][0]]
-    assert len(insert_calls) > 0
+    # Check that chunks were bulk loaded with COPY
+    assert conn.copy_records_to_table.called
+    args, kwargs = conn.copy_records_to_table.call_args
+    assert args[0] == "policy_documents"
+    assert len(kwargs["records"]) == chunk_count
+
+IVFFLAT_INDEX_DEF = (
+    "CREATE INDEX idx_policy_embedding ON public.policy_documents "
+    "USING ivfflat (embedding vector_ip_ops) WITH (lists='100')"
+)
 
+@pytest.mark.usefixtures("encoding")
+@pytest.mark.parametrize("existing_rows, rebuilt", [(0, True), (1000, False)])
+async def test_process_document_bulk_reindex(
+    monkeypatch, mock_pool, mock_embeddings, mock_docling, existing_rows, rebuilt
+):
+    """Test that vector indexes are dropped and rebuilt concurrently only for loads into a near-empty table"""
+    monkeypatch.setattr(document_processor, "BULK_REINDEX_THRESHOLD", 0)
+    conn = mock_pool.acquire.return_value.__aenter__.return_value
+    conn.fetchval.return_value = existing_rows
+    conn.fetch.return_value = [{"indexname": "idx_policy_embedding", "indexdef": IVFFLAT_INDEX_DEF}]
+    
+    await process_document(mock_pool, mock_embeddings, b"fake pdf content", "test.pdf", chunk_size=50, chunk_overlap=10)
+    
+    statements = [c.args[0] for c in conn.execute.call_args_list]
+    assert ('DROP INDEX CONCURRENTLY IF EXISTS "idx_policy_embedding"' in statements) is rebuilt
+    assert any(s.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_policy_embedding ON") for s in statements) is rebuilt
@@ -1,5 +1,4 @@
 """Tests for MCP server health monitoring."""
-import pytest
 import pytest_asyncio
 from unittest.mock import Mock, AsyncMock, patch
 import httpx
@@ -28,7 +27,6 @@ async def mcp_client():
         await client._http_client.aclose()
 
 
-@pytest.mark.asyncio
 async def test_get_server_health_all_healthy(mcp_client):
     """Test health check when all servers are healthy."""
     # Mock successful health checks for all servers
@@ -48,7 +46,6 @@ async def test_get_server_health_all_healthy(mcp_client):
     assert mcp_client._http_client.get.call_count == 4
 
 
-@pytest.mark.asyncio
 async def test_get_server_health_partial_failure(mcp_client):
     """Test health check when some servers are down."""
     # Mock mixed health check results
@@ -78,7 +75,6 @@ async def test_get_server_health_partial_failure(mcp_client):
     assert call_count == 4
 
 
-@pytest.mark.asyncio
 async def test_get_server_health_network_error(mcp_client):
     """Test health check when network errors occur."""
     # Mock network errors
@@ -101,7 +97,6 @@ async def test_get_server_health_network_error(mcp_client):
     assert health_status["rag"] is False
 
 
-@pytest.mark.asyncio
 async def test_get_server_health_timeout(mcp_client):
     """Test health check with timeout errors."""
     # Mock timeout for some servers
@@ -128,7 +123,6 @@ async def test_get_server_health_timeout(mcp_client):
     assert call_count == 4
 
 
-@pytest.mark.asyncio
 async def test_get_server_health_respects_timeout(mcp_client):
     """Test that health checks include timeout parameter."""
     mock_response = Mock()
@@ -142,7 +136,6 @@ async def test_get_server_health_respects_timeout(mcp_client):
         assert call[1].get("timeout") == 5.0
 
 
-@pytest.mark.asyncio
 async def test_health_check_returns_dict(mcp_client):
     """Test that health check returns proper dict structure."""
     mock_response = Mock()
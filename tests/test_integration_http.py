@@ -4,52 +4,58 @@ End-to-end integration tests for HTTP MCP architecture
 Tests the full system with HTTP MCP servers running independently.
 """
 import pytest
+import pytest_asyncio
 import uuid
-from fastapi.testclient import TestClient
-
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
 
 from main_http import app
 
 
-@pytest.fixture
-def client():
-    """Create test client for FastAPI app with lifespan context."""
-    with TestClient(app) as c:
-        yield c
+@pytest_asyncio.fixture(scope="module")
+async def client():
+    """
+    Create async test client for FastAPI app with lifespan context.
+    
+    Module-scoped so the app starts up (and connects to the MCP servers) once
+    for all integration tests instead of once per test. Requests go straight
+    to the ASGI app on the test event loop, without TestClient's thread portal.
+    """
+    async with LifespanManager(app, startup_timeout=60):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as c:
+            yield c
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_health_check(client):
+async def test_health_check(client):
     """Test that main_http health endpoint works."""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["status"] == "healthy"
     assert "mcp_client" in data
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_mcp_architecture_info(client):
+async def test_mcp_architecture_info(client):
     """Test that root endpoint shows HTTP MCP architecture info."""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["mcp_architecture"] == "HTTP (decoupled servers)"
     assert "mcp_servers" in data
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_mcp_servers_accessible(client):
+async def test_mcp_servers_accessible(client):
     """Test that all MCP servers are accessible."""
-    response = client.get("/mcp/servers")
+    response = await client.get("/mcp/servers")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     
     servers = data["servers"]
     assert len(servers) == 4
@@ -61,11 +67,11 @@ def test_mcp_servers_accessible(client):
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_mcp_tools_loaded(client):
+async def test_mcp_tools_loaded(client):
     """Test that MCP tools are loaded from all servers."""
-    response = client.get("/mcp/tools")
+    response = await client.get("/mcp/tools")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     
     assert data["total_tools"] > 0
     
@@ -75,25 +81,25 @@ def test_mcp_tools_loaded(client):
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_end_to_end_session_flow(client):
+async def test_end_to_end_session_flow(client):
     """Test complete session flow with HTTP MCP."""
     # 1. Create Session via chat
     chat_request = {
         "message": "I need auto insurance. I'm HTTP MCP Test User at httpmcp@example.com",
         "session_id": "integration-test-session"
     }
-    response = client.post("/chat", json=chat_request)
+    response = await client.post("/chat", json=chat_request)
     assert response.status_code == 200
-    session_data = response.json()
+    session_data = orjson.loads(response.content)
     session_id = session_data["session_id"]
     assert session_id == "integration-test-session"
     
     print(f"\n✓ Session created: {session_id}")
 
     # 2. Get Session Details
-    response = client.get(f"/session/{session_id}")
+    response = await client.get(f"/session/{session_id}")
     assert response.status_code == 200
-    session_details = response.json()
+    session_details = orjson.loads(response.content)
     assert session_details["id"] == session_id
     assert "status" in session_details
     assert "current_step" in session_details
@@ -105,11 +111,11 @@ def test_end_to_end_session_flow(client):
         "message": "I live at 456 Oak Ave, Boston, MA 02101",
         "session_id": session_id
     }
-    response = client.post("/chat", json=chat_request2)
+    response = await client.post("/chat", json=chat_request2)
     
     # May succeed or fail depending on LLM/MCP configuration
     if response.status_code == 200:
-        chat_response = response.json()
+        chat_response = orjson.loads(response.content)
         assert "response" in chat_response
         assert "current_step" in chat_response
         print(f"✓ Chat successful: {chat_response['current_step']}")
@@ -117,9 +123,9 @@ def test_end_to_end_session_flow(client):
         print(f"⚠ Chat failed (expected in some test environments): {response.status_code}")
 
     # 4. List Sessions
-    response = client.get("/sessions")
+    response = await client.get("/sessions")
     assert response.status_code == 200
-    sessions_data = response.json()
+    sessions_data = orjson.loads(response.content)
     assert "sessions" in sessions_data
     
     # Check our session is in the list
@@ -131,12 +137,12 @@ def test_end_to_end_session_flow(client):
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_workflow_steps_endpoint(client):
+async def test_workflow_steps_endpoint(client):
     """Test that MCP tools are available."""
     # Test tools endpoint
-    response = client.get("/mcp/tools")
+    response = await client.get("/mcp/tools")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     
     assert "total_tools" in data
     assert data["total_tools"] > 0
@@ -144,26 +150,26 @@ def test_workflow_steps_endpoint(client):
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_session_not_found(client):
+async def test_session_not_found(client):
     """Test handling of non-existent session."""
     fake_session_id = str(uuid.uuid4())
-    response = client.get(f"/session/{fake_session_id}")
+    response = await client.get(f"/session/{fake_session_id}")
     assert response.status_code == 404
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 @pytest.mark.integration
-def test_chat_with_invalid_session(client):
+async def test_chat_with_invalid_session(client):
     """Test chat creates new session if ID doesn't exist."""
     fake_session_id = str(uuid.uuid4())
     chat_msg = {
         "message": "Hello",
         "session_id": fake_session_id
     }
-    response = client.post("/chat", json=chat_msg)
+    response = await client.post("/chat", json=chat_msg)
     # Should create new session, not 404
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["session_id"] == fake_session_id
 
 
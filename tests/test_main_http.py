@@ -5,57 +5,65 @@ Tests the main application using HTTP MCP architecture.
 Requires HTTP MCP servers to be running (handled by conftest.py fixtures).
 """
 import pytest
-import json
+import pytest_asyncio
+import orjson
+from unittest.mock import patch, AsyncMock
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient, Response
+
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock, MagicMock
-from fastapi.testclient import TestClient
-from httpx import AsyncClient, Response
-from fastapi import HTTPException, status
+import copy
+import itertools
+import threading
+import time
 
-import sys
-import os
-import uuid
-from pathlib import Path
+from main_http import app, lifespan
+from error_handling import ServiceUnavailableError
+import session_store
+from session_store import FileSessionStore, load_sessions, save_sessions
 
-# Add project root to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main_http import app, sessions, load_sessions, save_sessions, SESSIONS_FILE
-from error_handling import KYCError, ErrorCode, ErrorResponse, ServiceUnavailableError, NotFoundError
+@pytest_asyncio.fixture(scope="session")
+async def client(tmp_path_factory):
+    """
+    Create async test client for FastAPI app with lifespan context.
+    
+    Session-scoped so the lifespan (session store and MCP client startup) runs
+    once; tests use unique session ids (see new_session_id) so they never collide.
+    Requests go straight to the ASGI app on the test event loop, without
+    TestClient's sync-to-async thread portal.
+    """
+    # Patch the sessions directory for testing
+    with patch('session_store.SESSIONS_DIR', tmp_path_factory.mktemp("sessions")):
+        async with LifespanManager(app, startup_timeout=60):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as c:
+                yield c
 
 
-@pytest.fixture
-def client():
-    """Create test client for FastAPI app with lifespan context."""
-    # Setup test environment
-    test_session_file = Path("test_sessions.json")
-    if test_session_file.exists():
-        test_session_file.unlink()
-    
-    # Patch the sessions file path for testing
-    with patch('main_http.SESSIONS_FILE', test_session_file):
-        with TestClient(app) as c:
-            yield c
-    
-    # Cleanup
-    if test_session_file.exists():
-        test_session_file.unlink()
+def post_json(client: AsyncClient, url: str, obj) -> Response:
+    """POST a JSON body encoded with orjson instead of httpx's stdlib json encoder."""
+    return client.post(url, content=orjson.dumps(obj), headers={"content-type": "application/json"})
+
+
+# Run start time plus a counter keeps ids unique without reading /dev/urandom
+_SESSION_ID_PREFIX = time.time_ns()
+_session_counter = itertools.count()
+
+
+def new_session_id(prefix: str = "test") -> str:
+    """Unique session id, so tests sharing the client do not see each other's sessions."""
+    return f"{prefix}-{_SESSION_ID_PREFIX}-{next(_session_counter)}"
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestMainHTTPApplication:
     """Test suite for main_http FastAPI application with HTTP MCP"""
     
-    def setup_method(self):
-        """Setup before each test"""
-        # Clear sessions before each test
-        sessions.clear()
-    
-    def test_root_endpoint(self, client):
+    async def test_root_endpoint(self, client):
         """Test root endpoint shows HTTP MCP info"""
-        response = client.get("/")
+        response = await client.get("/")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "service" in data
         assert "HTTP MCP" in data["service"]
         assert "version" in data
@@ -72,47 +80,47 @@ class TestMainHTTPApplication:
         # Trace ID is optional (only present if OpenTelemetry span is active)
         # assert "x-trace-id" in response.headers
     
-    @patch('main_http.get_mcp_client')
-    def test_health_check(self, mock_get_mcp_client, client):
+    @patch.object(app.state, 'mcp_client')
+    async def test_health_check(self, mock_client, client):
         """Test health check endpoint"""
         # Mock MCP client
-        mock_client = MagicMock()
         mock_client.is_connected.return_value = True
-        mock_get_mcp_client.return_value = mock_client
+        mock_client.get_server_health = AsyncMock(return_value={
+            "postgres": True, "blob": True, "email": True, "rag": True
+        })
         
-        response = client.get("/health")
+        response = await client.get("/health")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["status"] == "healthy"
         assert "service" in data
         assert "version" in data
         assert data["mcp_connected"] is True
+        assert data["mcp_servers"]["rag"] is True
         
         # Test response headers
         assert "x-request-id" in response.headers
         # Trace ID is optional
         # assert "x-trace-id" in response.headers
     
-    @patch('main_http.get_mcp_client')
-    def test_health_check_service_unavailable(self, mock_get_mcp_client, client):
+    @patch.object(app.state, 'mcp_client')
+    async def test_health_check_service_unavailable(self, mock_client, client):
         """Test health check when MCP client is not connected"""
         # Mock MCP client as not connected
-        mock_client = MagicMock()
         mock_client.is_connected.return_value = False
-        mock_get_mcp_client.return_value = mock_client
         
-        response = client.get("/health")
+        response = await client.get("/health")
         assert response.status_code == 503
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "error" in data
         assert data["error"]["code"] == "service_unavailable"
         assert "MCP client is not connected" in data["error"]["message"]
     
-    def test_mcp_servers_status(self, client):
+    async def test_mcp_servers_status(self, client):
         """Test MCP servers status endpoint"""
-        response = client.get("/mcp/servers")
+        response = await client.get("/mcp/servers")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "servers" in data
         servers = data["servers"]
         assert len(servers) == 4
@@ -125,26 +133,17 @@ class TestMainHTTPApplication:
             assert isinstance(servers[server_name], str)
             assert "http" in servers[server_name]
     
-    @patch('main_http.get_mcp_client')
-    def test_list_mcp_tools(self, mock_get_mcp_client, client):
+    @patch.object(app.state, 'mcp_client')
+    async def test_list_mcp_tools(self, mock_client, client):
         """Test listing available MCP tools"""
-        # Mock MCP client with async get_tools
-        mock_client = MagicMock()
-        # Create mock tool objects
-        mock_tool = MagicMock()
-        mock_tool.name = "test__test_tool"
-        mock_tool.description = "A test tool"
-        mock_tool.args_schema = None
+        # Mock MCP client with cached tool metadata
+        mock_client.cached_tools_metadata.return_value = [
+            {"name": "test__test_tool", "description": "A test tool"}
+        ]
         
-        # Make get_tools return an async result
-        async def mock_get_tools():
-            return [mock_tool]
-        mock_client.get_tools = mock_get_tools
-        mock_get_mcp_client.return_value = mock_client
-        
-        response = client.get("/mcp/tools")
+        response = await client.get("/mcp/tools")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "tools" in data
         assert "total_tools" in data
         assert isinstance(data["tools"], list)
@@ -155,121 +154,129 @@ class TestMainHTTPApplication:
         # Trace ID is optional
         # assert "x-trace-id" in response.headers
     
-    @patch('main_http.get_mcp_client')
-    def test_list_mcp_tools_service_unavailable(self, mock_get_mcp_client, client):
+    @patch.object(app.state, 'mcp_client', None)
+    async def test_list_mcp_tools_service_unavailable(self, client):
         """Test listing MCP tools when service is unavailable"""
-        # Mock MCP client as None
-        mock_get_mcp_client.return_value = None
-        
-        response = client.get("/mcp/tools")
+        response = await client.get("/mcp/tools")
         assert response.status_code == 503
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "error" in data
         assert data["error"]["code"] == "service_unavailable"
     
-    def test_list_sessions_empty(self, client):
+    async def test_list_sessions_empty(self, client):
         """Test listing sessions when none exist"""
-        response = client.get("/sessions")
+        response = await client.get("/sessions")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "sessions" in data
         assert isinstance(data["sessions"], list)
     
-    def test_chat_creates_new_session(self, client):
+    async def test_chat_creates_new_session(self, client):
         """Test that chat endpoint creates new session if none exists"""
         chat_request = {
             "message": "I need business insurance",
             "session_id": None  # Let system generate
         }
         
-        response = client.post("/chat", json=chat_request)
+        response = await post_json(client, "/chat", chat_request)
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         
         assert "session_id" in data
         assert "response" in data
         assert "status" in data
         assert "current_step" in data
     
-    def test_get_session_existing(self, client):
+    async def test_get_session_existing(self, client):
         """Test getting an existing session"""
         # First create a session via chat
         chat_request = {
             "message": "I need insurance",
-            "session_id": "test-session-123"
+            "session_id": new_session_id()
         }
         
-        create_response = client.post("/chat", json=chat_request)
+        create_response = await post_json(client, "/chat", chat_request)
         assert create_response.status_code == 200
-        session_id = create_response.json()["session_id"]
+        session_id = orjson.loads(create_response.content)["session_id"]
         
         # Now get the session
-        response = client.get(f"/session/{session_id}")
+        response = await client.get(f"/session/{session_id}")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         
         assert data["id"] == session_id
         assert "status" in data
         assert "current_step" in data
     
-    def test_get_session_nonexistent(self, client):
+    async def test_get_session_nonexistent(self, client):
         """Test getting a non-existent session"""
-        response = client.get("/session/non-existent-id")
+        response = await client.get("/session/non-existent-id")
         assert response.status_code == 404
-        assert "Session not found" in response.json()["detail"]
+        assert "Session not found" in orjson.loads(response.content)["detail"]
     
-    def test_delete_session(self, client):
+    async def test_delete_session(self, client):
         """Test deleting a session"""
         # Create a session first
+        session_id = new_session_id("test-delete")
         chat_request = {
             "message": "Test",
-            "session_id": "test-delete-123"
+            "session_id": session_id
         }
-        client.post("/chat", json=chat_request)
+        await post_json(client, "/chat", chat_request)
         
         # Delete it
-        response = client.delete("/session/test-delete-123")
+        response = await client.delete(f"/session/{session_id}")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["deleted"] == True
-        assert data["session_id"] == "test-delete-123"
+        assert data["session_id"] == session_id
         
         # Verify it's gone
-        get_response = client.get("/session/test-delete-123")
+        get_response = await client.get(f"/session/{session_id}")
         assert get_response.status_code == 404
     
-    def test_list_sessions(self, client):
+    async def test_list_sessions(self, client):
         """Test listing all sessions"""
         # Create a couple of sessions via chat
-        for i in range(2):
-            client.post("/chat", json={
+        session_ids = [new_session_id() for _ in range(2)]
+        for i, session_id in enumerate(session_ids):
+            await post_json(client, "/chat", {
                 "message": f"Test message {i}",
-                "session_id": f"test-session-{i}"
+                "session_id": session_id
             })
         
-        response = client.get("/sessions")
+        response = await client.get("/sessions")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         
         assert "sessions" in data
         assert len(data["sessions"]) >= 2
+        
+        summary = next(s for s in data["sessions"] if s["id"] == session_ids[0])
+        assert summary["message_count"] >= 1
+        assert "messages" not in summary
+        
+        response = await client.get("/sessions", params={"full": "true"})
+        assert response.status_code == 200
+        full = next(s for s in orjson.loads(response.content)["sessions"] if s["id"] == session_ids[0])
+        assert "messages" in full
     
-    def test_session_persistence(self, client):
+    async def test_session_persistence(self, client):
         """Test that sessions can be retrieved after creation"""
         # Create a session
         chat_request = {
             "message": "Persistent message",
-            "session_id": "persist-test-123"
+            "session_id": new_session_id("persist-test")
         }
         
-        response = client.post("/chat", json=chat_request)
+        response = await post_json(client, "/chat", chat_request)
         assert response.status_code == 200
-        session_id = response.json()["session_id"]
+        session_id = orjson.loads(response.content)["session_id"]
         
         # Verify session exists
-        get_response = client.get(f"/session/{session_id}")
+        get_response = await client.get(f"/session/{session_id}")
         assert get_response.status_code == 200
-        session_data = get_response.json()
+        session_data = orjson.loads(get_response.content)
         assert session_data["id"] == session_id
 
 
@@ -277,59 +284,129 @@ class TestMainHTTPApplication:
 class TestChatEndpoint:
     """Test chat endpoint with HTTP MCP"""
     
-    def setup_method(self):
-        """Setup before each test"""
-        sessions.clear()
-    
-    def test_chat_endpoint_basic(self, client):
+    async def test_chat_endpoint_basic(self, client):
         """Test basic chat functionality"""
         # Chat without pre-existing session
+        session_id = new_session_id("chat-test")
         chat_request = {
             "message": "I need auto insurance",
-            "session_id": "chat-test-789"
+            "session_id": session_id
         }
         
-        response = client.post("/chat", json=chat_request)
+        response = await post_json(client, "/chat", chat_request)
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         
         assert "response" in data
         assert "session_id" in data
-        assert data["session_id"] == "chat-test-789"
+        assert data["session_id"] == session_id
         assert "status" in data
         assert "current_step" in data
     
-    def test_chat_nonexistent_session(self, client):
+    async def test_chat_nonexistent_session(self, client):
         """Test chat creates session if it doesn't exist"""
+        session_id = new_session_id("new-session")
         chat_request = {
             "message": "Hello",
-            "session_id": "new-session-456"
+            "session_id": session_id
         }
         
-        response = client.post("/chat", json=chat_request)
+        response = await post_json(client, "/chat", chat_request)
         # Should create new session, not 404
         assert response.status_code == 200
-        data = response.json()
-        assert data["session_id"] == "new-session-456"
+        data = orjson.loads(response.content)
+        assert data["session_id"] == session_id
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestDocumentEndpoints:
     """Test document upload/retrieval with HTTP MCP"""
     
-    def setup_method(self):
-        """Setup before each test"""
-        sessions.clear()
-    
-    def test_root_returns_info(self, client):
+    async def test_root_returns_info(self, client):
         """Test that root endpoint returns service info"""
-        response = client.get("/")
+        response = await client.get("/")
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "service" in data
         assert "version" in data
         assert "mcp_architecture" in data
 
 
+
+class TestSessionPersistence:
+    """Test per-session file persistence"""
+    
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test that only the given sessions are written and deleted ids are removed"""
+        data = {
+            "a": {"id": "a", "messages": []},
+            "../b": {"id": "../b", "messages": []},
+        }
+        save_sessions(tmp_path, data)
+        # Session ids are quoted, so they cannot escape the sessions directory
+        assert sorted(p.name for p in tmp_path.glob("*.json")) == ["..%2Fb.json", "a.json"]
+        assert load_sessions(tmp_path) == data
+        
+        del data["a"]
+        save_sessions(tmp_path, data, ["a"])
+        assert load_sessions(tmp_path) == {"../b": data["../b"]}
+    
+    async def test_file_store_flushes_on_close(self, tmp_path):
+        """Test that changes made while the flusher runs are on disk after close()"""
+        store = FileSessionStore(tmp_path)
+        await store.start()
+        await store.save({"id": "s1", "messages": []})
+        await store.save({"id": "s2", "messages": []})
+        assert await store.delete("s2") is True
+        assert await store.delete("missing") is False
+        await store.close()
+        
+        assert load_sessions(tmp_path) == {"s1": {"id": "s1", "messages": []}}
+        assert await FileSessionStore(tmp_path).get("s1") == {"id": "s1", "messages": []}
+    
+    async def test_file_store_close_waits_for_inflight_save(self, tmp_path):
+        """Test that an older snapshot saved by the flusher never overwrites the final save in close()"""
+        started, finished = threading.Event(), threading.Event()
+        
+        def slow_save(directory, sessions, session_ids=None):
+            snapshot = copy.deepcopy(sessions)
+            started.set()
+            time.sleep(0.3)
+            save_sessions(directory, snapshot, session_ids)
+            finished.set()
+        
+        store = FileSessionStore(tmp_path)
+        await store.start()
+        with patch.object(session_store, "save_sessions", slow_save):
+            await store.save({"id": "s1", "messages": [1]})
+            await asyncio.to_thread(started.wait)
+            await store.save({"id": "s1", "messages": [1, 2]})
+            await store.close()
+        
+        assert finished.is_set()
+        assert load_sessions(tmp_path) == {"s1": {"id": "s1", "messages": [1, 2]}}
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+
+class TestLifespan:
+    """Test application startup and shutdown"""
+    
+    async def test_session_store_closed_when_mcp_init_fails(self):
+        """Test that a failed MCP client startup still closes the session store"""
+        session_store = AsyncMock()
+        mcp_client = AsyncMock()
+        mcp_client.initialize.side_effect = ConnectionError("MCP servers unreachable")
+        
+        with patch('main_http.create_session_store', return_value=session_store), \
+                patch('main_http.initialize_mcp_client', return_value=mcp_client):
+            with pytest.raises(ServiceUnavailableError):
+                async with lifespan(app):
+                    pass
+        
+        session_store.start.assert_awaited_once()
+        session_store.close.assert_awaited_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,37 @@
+"""
+Unit tests for the class-based MCP servers (mcp_servers/)
+
+Checks each server's tool name lookup and unknown-tool handling. No external
+services are needed: servers connect to Postgres/Azure/SMTP lazily, on the
+first real tool call.
+"""
+import pytest
+
+from mcp_servers import BlobMCPServer, EmailMCPServer, PostgresMCPServer, RAGMCPServer
+
+
+SERVER_CLASSES = [PostgresMCPServer, BlobMCPServer, EmailMCPServer, RAGMCPServer]
+
+
+@pytest.fixture(params=SERVER_CLASSES, ids=lambda cls: cls.__name__)
+def server(request):
+    """One instance of each MCP server."""
+    return request.param()
+
+
+def test_tool_name_set_matches_get_tools(server):
+    """Test that the cached tool names match the tool definitions"""
+    assert server.tool_name_set == frozenset(tool["name"] for tool in server.get_tools())
+
+
+def test_has_tool(server):
+    """Test that _has_tool knows the server's own tools and nothing else"""
+    assert all(server._has_tool(tool["name"]) for tool in server.get_tools())
+    assert not server._has_tool("nonexistent_tool")
+
+
+async def test_call_unknown_tool(server):
+    """Test that an unknown tool is rejected without touching external services"""
+    result = await server.call_tool("nonexistent_tool", {})
+    assert result.success is False
+    assert result.error == "Unknown tool: nonexistent_tool"
@@ -12,7 +12,9 @@ Rationale for not testing /mcp endpoint directly:
 - Testing raw protocol would duplicate client tests without adding value
 - These tests verify servers are running; functional tests use proper MCP client
 """
+import asyncio
 import pytest
+import pytest_asyncio
 import httpx
 
 
@@ -24,80 +26,42 @@ MCP_SERVERS = {
 }
 
 
-@pytest.mark.usefixtures("mcp_server_processes")
-class TestPostgresHTTPServer:
-    """Test PostgreSQL HTTP MCP Server."""
-    
-    @pytest.mark.asyncio
-    async def test_health_endpoint(self):
-        """Test Postgres server health endpoint."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{MCP_SERVERS['postgres']}/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "ok"
-            assert "service" in data
+@pytest_asyncio.fixture(scope="module")
+async def http_client():
+    """One keep-alive HTTP client shared by every health check in this module."""
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        yield client
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
-class TestBlobHTTPServer:
-    """Test Blob Storage HTTP MCP Server."""
+class TestServerHealth:
+    """Test each HTTP MCP server's health endpoint."""
     
-    @pytest.mark.asyncio
-    async def test_health_endpoint(self):
-        """Test Blob server health endpoint."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{MCP_SERVERS['blob']}/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "ok"
-            assert "service" in data
-
-
-@pytest.mark.usefixtures("mcp_server_processes")
-class TestEmailHTTPServer:
-    """Test Email HTTP MCP Server."""
-    
-    @pytest.mark.asyncio
-    async def test_health_endpoint(self):
-        """Test Email server health endpoint."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{MCP_SERVERS['email']}/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "ok"
-            assert "service" in data
-
-
-@pytest.mark.usefixtures("mcp_server_processes")
-class TestRAGHTTPServer:
-    """Test RAG HTTP MCP Server."""
-    
-    @pytest.mark.asyncio
-    async def test_health_endpoint(self):
-        """Test RAG server health endpoint."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{MCP_SERVERS['rag']}/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "ok"
-            assert "service" in data
+    @pytest.mark.parametrize("name", list(MCP_SERVERS))
+    async def test_health_endpoint(self, http_client, name):
+        """Test a server's health endpoint."""
+        response = await http_client.get(f"{MCP_SERVERS[name]}/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ok"
+        assert "service" in data
 
 
 @pytest.mark.usefixtures("mcp_server_processes")
 class TestAllServersHealth:
     """Test all servers are healthy."""
     
-    @pytest.mark.asyncio
-    async def test_all_servers_responding(self):
+    async def test_all_servers_responding(self, http_client):
         """Test all 4 HTTP MCP servers are responding to health checks."""
-        async with httpx.AsyncClient() as client:
-            for name, url in MCP_SERVERS.items():
-                response = await client.get(f"{url}/health", timeout=5.0)
-                assert response.status_code == 200, f"{name} server not responding"
-                data = response.json()
-                assert data["status"] == "ok", f"{name} server not healthy"
-                print(f"✓ {name} server healthy")
+        # The checks are independent, so send them concurrently
+        responses = await asyncio.gather(
+            *(http_client.get(f"{url}/health") for url in MCP_SERVERS.values())
+        )
+        for name, response in zip(MCP_SERVERS, responses):
+            assert response.status_code == 200, f"{name} server not responding"
+            data = response.json()
+            assert data["status"] == "ok", f"{name} server not healthy"
+            print(f"✓ {name} server healthy")
 
 
 if __name__ == "__main__":
@@ -27,7 +27,6 @@ async def mcp_client():
         await client._http_client.aclose()
 
 
-@pytest.mark.asyncio
 async def test_call_tool_creates_span(mcp_client):
     """Test that call_tool creates an OpenTelemetry span."""
     from error_handling import get_tracer
@@ -48,7 +47,6 @@ async def test_call_tool_creates_span(mcp_client):
     assert result == {"result": "success"}
 
 
-@pytest.mark.asyncio
 async def test_call_tool_sets_span_attributes(mcp_client):
     """Test that call_tool sets correct span attributes."""
     from error_handling import get_tracer
@@ -73,7 +71,6 @@ async def test_call_tool_sets_span_attributes(mcp_client):
     assert "mcp.tool.status" in attribute_names
 
 
-@pytest.mark.asyncio
 async def test_call_tool_span_status_success(mcp_client):
     """Test that span has success status for successful calls."""
     from error_handling import get_tracer
@@ -94,7 +91,6 @@ async def test_call_tool_span_status_success(mcp_client):
     assert status_calls[0][0][1] == "success"
 
 
-@pytest.mark.asyncio
 async def test_call_tool_span_status_error(mcp_client):
     """Test that span has error status for failed calls."""
     from error_handling import get_tracer
@@ -126,7 +122,6 @@ async def test_call_tool_span_status_error(mcp_client):
     assert "Tool error" in error_calls[0][0][1]
 
 
-@pytest.mark.asyncio
 async def test_get_tools_creates_span(mcp_client):
     """Test that get_tools creates an OpenTelemetry span."""
     from error_handling import get_tracer
@@ -148,7 +143,6 @@ async def test_get_tools_creates_span(mcp_client):
     assert tools[0].name == "test_tool"
 
 
-@pytest.mark.asyncio
 async def test_circuit_breaker_open_span_status(mcp_client):
     """Test that span has circuit_open status when circuit breaker opens."""
     from error_handling import get_tracer
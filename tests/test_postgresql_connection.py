@@ -6,9 +6,6 @@ import os
 import sys
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 def test_postgresql():
     print("=" * 60)
     print("Testing PostgreSQL Connection")
@@ -70,5 +67,7 @@ def test_postgresql():
         return False
 
 if __name__ == "__main__":
+    # Under pytest, conftest.py loads .env once for the whole session
+    load_dotenv()
     success = test_postgresql()
     sys.exit(0 if success else 1)
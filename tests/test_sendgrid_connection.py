@@ -6,9 +6,6 @@ import os
 import sys
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 def test_sendgrid():
     print("=" * 60)
     print("Testing SendGrid API Connection")
@@ -69,6 +66,8 @@ def test_sendgrid():
 
 
 if __name__ == "__main__":
+    # Under pytest, conftest.py loads .env once for the whole session
+    load_dotenv()
     success = test_sendgrid()
     import sys
     sys.exit(0 if success else 1)